@@ -68,14 +68,51 @@ the function will take slightly more time.
 
 import sys
 from types import FunctionType
+from weakref import WeakKeyDictionary, WeakSet
 
-from anntools.cooperation import TupleCooperation
+from anntools.common import wraps, get_plain_argument_names, compile_function
+from anntools.cooperation import TupleCooperation, _MISSING
 
 #============================================================================
 # Exported symbols
 
 __all__=['AnnotationDecorator', 'annotate']
 
+#============================================================================
+# Specialized annotation code for the default cooperation scheme
+
+def _fast_tuple_apply(annotations, kw, classfilter):
+    '''Adds annotations to the annotation dictionary exactly like
+    TupleCooperation.add, but without creating a Cooperation instance.
+    Tuples and objects not fitting the class filter (error reporting)
+    are passed to TupleCooperation.add.'''
+    check=classfilter is not object
+    for name, obj in kw.items():
+        if isinstance(obj, tuple) or (check and not isinstance(obj, classfilter)):
+            TupleCooperation(annotations, name, classfilter).add(obj)
+            continue
+        storage=annotations.get(name, _MISSING)
+        if storage is _MISSING:
+            annotations[name]=obj
+        elif isinstance(storage, tuple):
+            annotations[name]=storage+(obj,)
+        else:
+            annotations[name]=(storage, obj)
+
+#============================================================================
+# Wrappers following the annotations added later, see AnnotationDecorator.watch
+
+# Maps the functions (the function of bound methods) to the set of their
+# wrappers. Wrappers are held weakly, they keep their own refresh callable.
+_watched=WeakKeyDictionary()
+
+def _notify(ofn):
+    '''Calls the refresh callables of the live wrappers of the function.'''
+    wrappers=_watched.get(getattr(ofn, '__func__', ofn))
+    if wrappers:
+        for wrapper in list(wrappers):
+            wrapper._annotation_refresh_()
+
 #============================================================================
 
 class AnnotationDecorator(object):
@@ -85,36 +122,74 @@ class AnnotationDecorator(object):
     Use the new Py3K style syntax with Python 3.0 and newer instead of
     this decorator wherever you don't require backward compatibility.'''
     _classfilter=object
-    def __init__(self, cooperation_class, cooperation_keywords={}):
-        '''Initialize the decorator for a specific cooperation scheme.'''
+    # Set to True in subclasses, whose wrappers follow annotations added
+    # later (see watch) and can run their checks any number of times.
+    # Decorating such a wrapper with the same decorator adds the new
+    # annotations to it instead of wrapping it again.
+    _merge_stacked=False
+    def __init__(self, cooperation_class, cooperation_keywords=None):
+        '''Initialize the decorator for a specific cooperation scheme.
+        Additional keyword arguments for the cooperation class can be
+        passed in the cooperation_keywords dictionary.'''
         self.cooperation_class=cooperation_class
-        self.cooperation_keywords=cooperation_keywords
+        # None if there are no keywords to pass
+        self.cooperation_keywords=cooperation_keywords or None
+        # Specialized function to add annotations or None for generic code
+        if cooperation_class is TupleCooperation and not cooperation_keywords:
+            self._fast_apply=_fast_tuple_apply
+        else:
+            self._fast_apply=None
+        # Cooperation instance reused by the decorator for all functions.
+        # Decoration is not safe for concurrent use this way, but functions
+        # are decorated at definition (usually import) time anyway.
+        self._cooperation=self.cooperate(None)
+        # Wrappers created by this decorator, identified by identity, since
+        # attributes are copied to foreign wrappers by functools.wraps
+        self._wrappers=WeakSet()
     def __call__(self, __return__=None, **kw):
         '''The decorator itself'''
         # Decorator
         def decorator(fn):
             '''Decorate a function'''
             # Determine the original function from a possible wrapper chain
-            if hasattr(fn, '_original_function_'):
-                ofn=fn._original_function_
-            else:
-                ofn=fn
+            ofn=getattr(fn, '_original_function_', fn)
             # Add an empty dict if no function annotations exists.
-            if not hasattr(ofn, '__annotations__'):
-                ofn.__annotations__={}
+            annotations=getattr(ofn, '__annotations__', None)
+            if annotations is None:
+                ofn.__annotations__=annotations={}
             # Add new annotations according to the current cooperation scheme
-            cooperation=self.cooperate(ofn.__annotations__)
-            for name, obj in kw.items():
-                cooperation.key=name
-                cooperation.add(obj)
-            del cooperation
+            if not kw:
+                # Nothing to add, no need for a Cooperation instance
+                pass
+            elif self._fast_apply is not None:
+                # Specialized code for the cooperation scheme
+                self._fast_apply(annotations, kw, self._classfilter)
+            else:
+                cooperation=self._cooperation
+                cooperation.space=annotations
+                try:
+                    for name, obj in kw.items():
+                        cooperation.key=name
+                        cooperation.add(obj)
+                finally:
+                    # Do not keep the annotations of the function alive
+                    cooperation.space=None
+            # Let existing wrappers know about the new annotations
+            if kw:
+                _notify(ofn)
+            # Stacked directly on a wrapper made by this decorator, which
+            # already follows the new annotations, no need for another one
+            if self._merge_stacked and fn in self._wrappers:
+                return fn
             # Optional wrapping of the decorated function
             wrapper=self.wrap(fn, ofn)
             if wrapper is not fn:
-                wrapper._original_function_=fn
+                wrapper._original_function_=ofn
+                if self._merge_stacked:
+                    self._wrappers.add(wrapper)
             return wrapper
         # Is this decorator used with an argument list (called)?
-        if __return__ is None or type(__return__)!=FunctionType or kw:
+        if kw or __return__ is None or type(__return__) is not FunctionType:
             # Optional return value converter
             if __return__ is not None:
                 kw['return']=__return__
@@ -125,13 +200,104 @@ class AnnotationDecorator(object):
     def cooperate(self, annotations):
         '''Returns a Cooperation instance to allow cooperative access of the
         annotation dictionary. The cooperation schemes is determined by the
-        cooperation class used.'''
+        cooperation class used. Returns a new instance on each call, so it
+        is safe to use from wrappers running at function call time.'''
         # The object key must be set in the loop later
-        # (reuse single Cooperation instance for performace)
+        if self.cooperation_keywords is None:
+            return self.cooperation_class(
+                annotations, None, classfilter=self._classfilter
+            )
         return self.cooperation_class(
             annotations, None, classfilter=self._classfilter,
             **self.cooperation_keywords
         )
+    def collect(self, annotations):
+        '''Returns a dictionary mapping each annotated name to the tuple of
+        annotation objects accessible by the cooperation scheme. Names
+        without such objects are left out. Wrappers should collect the
+        annotations once when the function is wrapped instead of accessing
+        the annotation dictionary on each function call.'''
+        collected={}
+        cooperation=self.cooperate(annotations)
+        for name in annotations:
+            cooperation.key=name
+            objs=tuple(cooperation)
+            if objs:
+                collected[name]=objs
+        return collected
+    def watch(self, ofn, wrapper, refresh):
+        '''Registers a callable to be called without arguments each time an
+        annotation decorator adds annotations to the original function, as
+        long as the wrapper is alive. Wrappers collecting annotations at
+        wrapping time must use this to follow annotations added later by
+        decorators applied on them. Nothing is stored on the original
+        function, which can be a bound method as well.'''
+        wrapper._annotation_refresh_=refresh
+        key=getattr(ofn, '__func__', ofn)
+        wrappers=_watched.get(key)
+        if wrappers is None:
+            _watched[key]=wrappers=WeakSet()
+        wrappers.add(wrapper)
+    def compileWrapper(self, fn, ofn, check):
+        '''Returns a wrapper generated for the argument list of the original
+        function, which calls check(fn, objs, name, value) for each
+        annotated argument and the return value, where objs is the tuple of
+        collected annotation objects. Calls no function for arguments without
+        annotations and needs no loops or argument packing. The wrapper is
+        updated in place when annotations are added later. Returns None if
+        the function has no plain signature (see get_plain_argument_names),
+        the caller must use a generic wrapper in this case.'''
+        argnames=get_plain_argument_names(ofn)
+        if argnames is None:
+            return None
+        for name in argnames:
+            if name.startswith('_anntools_'):
+                # Would hide names used by the generated code
+                return None
+        wrapper=None
+        def refresh():
+            '''Generates the wrapper for the current annotations.'''
+            nonlocal wrapper
+            plan=self.collect(ofn.__annotations__)
+            if wrapper is None:
+                namespace={}
+            else:
+                # Calls running the current code may still use its names,
+                # new objects get new names numbered after them
+                namespace=dict(wrapper.__globals__)
+            namespace['_anntools_fn']=fn
+            namespace['_anntools_check']=check
+            arguments=', '.join(argnames)
+            lines=['def wrapper(%s):'%arguments]
+            for name in argnames:
+                objs=plan.get(name)
+                if objs is not None:
+                    lines.extend(self.indent(self.generateCheck(name, objs, name, namespace)))
+            objs=plan.get('return')
+            if objs is None:
+                lines.append('    return _anntools_fn(%s)'%arguments)
+            else:
+                lines.append('    _anntools_return=_anntools_fn(%s)'%arguments)
+                lines.extend(self.indent(self.generateCheck('return', objs, '_anntools_return', namespace)))
+                lines.append('    return _anntools_return')
+            wrapper=compile_function('\n'.join(lines)+'\n', namespace, wrapper)
+        refresh()
+        wrapper=wraps(fn)(wrapper)
+        self.watch(ofn, wrapper, refresh)
+        return wrapper
+    def indent(self, source):
+        '''Returns the lines of a generated source code fragment indented
+        into the body of the generated wrapper.'''
+        return ['    '+line for line in source.split('\n')]
+    def generateCheck(self, name, objs, variable, namespace):
+        '''Returns source code for compileWrapper, which checks the value of
+        an argument or the return value stored in the given local variable.
+        Multiple lines must be separated by newlines and indented relative to
+        the first one. Objects referenced by the code must be stored in the
+        namespace with names starting with _anntools_.'''
+        key='_anntools_%d'%len(namespace)
+        namespace[key]=objs
+        return '_anntools_check(_anntools_fn, %s, %r, %s)'%(key, name, variable)
     def wrap(self, fn, ofn):
         '''Does not wrap the function by default. Subclasses can override
         this function to wrap the annotated function. Note, that you must
@@ -9,11 +9,30 @@ Common utilities.
 
 #============================================================================
 
+import os
 import sys
 
 #============================================================================
 
-__all__ = ['wraps', 'get_function_argument_names']
+__all__ = [
+    'wraps', 'get_function_argument_names', 'get_plain_argument_names',
+    'compile_function', 'validation_enabled', 'VALIDATION_ENABLED',
+]
+
+#============================================================================
+# Runtime checks
+
+def validation_enabled(environ=os.environ):
+    '''Returns False if the validation decorators are turned off by
+    the environment. Either ANNTOOLS_VALIDATION=0 (or false, no, off)
+    or ANNTOOLS_DISABLE_VALIDATE=1 turns them off.'''
+    if environ.get('ANNTOOLS_VALIDATION', '1').lower() in ('0', 'false', 'no', 'off'):
+        return False
+    return environ.get('ANNTOOLS_DISABLE_VALIDATE', '0')!='1'
+
+# Wrapping by the validation and type checking decorators can be turned off
+# in production by setting the environment, see validation_enabled
+VALIDATION_ENABLED=validation_enabled()
 
 #============================================================================
 # Function wrapper decorator
@@ -55,6 +74,80 @@ else:
     from inspect import getfullargspec
     
     def get_function_argument_names(fn):
-        return getfullargspec(fn)[0]
+        # Read the names from the code object, getfullargspec builds a
+        # complete signature and is required only for other callables
+        code=getattr(fn, '__code__', None)
+        if code is None:
+            return getfullargspec(fn)[0]
+        names=list(code.co_varnames[:code.co_argcount])
+        if ismethod(fn):
+            # The first argument is bound, it's not passed by the caller
+            del names[:1]
+        return names
+
+#============================================================================
+# Functions with plain signatures
+
+from inspect import CO_VARARGS, CO_VARKEYWORDS, ismethod
+
+# Code flags of functions accepting variable arguments (*args, **kw)
+_CO_VARIABLE_ARGUMENTS=CO_VARARGS|CO_VARKEYWORDS
+
+def get_plain_argument_names(fn):
+    '''Returns the tuple of argument names if the function accepts only
+    arguments without default values which can be passed by position or by
+    keyword. Returns None for all other functions (variable arguments,
+    keyword only or positional only arguments, default values) and for
+    objects without function code. A wrapper with the same argument list
+    can call such functions by passing all arguments by position. The
+    bound first argument of methods is not included.'''
+    code=getattr(fn, '__code__', None)
+    if (code is None or code.co_flags&_CO_VARIABLE_ARGUMENTS or
+        code.co_kwonlyargcount or getattr(code, 'co_posonlyargcount', 0) or
+        getattr(fn, '__defaults__', None)):
+        return None
+    if ismethod(fn):
+        if not code.co_argcount:
+            return None
+        return code.co_varnames[1:code.co_argcount]
+    return code.co_varnames[:code.co_argcount]
+
+#============================================================================
+# Generating functions at runtime
+
+from functools import lru_cache
+
+# Maximum number of code objects kept by compile_function, protects from
+# growing without limits when functions are decorated at runtime
+_MAX_COMPILED_CODE=256
+
+@lru_cache(maxsize=_MAX_COMPILED_CODE)
+def _compile(source):
+    '''Returns the code object compiled from the source code.'''
+    return compile(source, '<anntools>', 'exec')
+
+def compile_function(source, namespace, function=None):
+    '''Executes the source code of a single function definition named
+    wrapper in the namespace dictionary and returns the new function. The
+    code is compiled only once for each distinct source (recently used).
+    If an existing function (created by this function) is passed, then the
+    names of the namespace are added to it's globals and it's code is
+    replaced by the new code instead, so references to the existing function
+    remain valid. Calls running the old code at the same time still find
+    their names, since the globals are never removed: the namespace must
+    bind the names already in the globals to the same objects.
+    @param source: Source code defining a function named wrapper.
+    @param namespace: Global names used by the function.
+    @param function: Optional function to be updated in place.
+    '''
+    code=_compile(source)
+    exec(code, namespace)
+    new_function=namespace.pop('wrapper')
+    if function is None:
+        return new_function
+    # All names are in place before the new code runs
+    function.__globals__.update(namespace)
+    function.__code__=new_function.__code__
+    return function
 
 #============================================================================
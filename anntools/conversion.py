@@ -81,6 +81,7 @@ application.)
 #============================================================================
 
 import sys
+from operator import attrgetter
 
 from anntools.common import wraps, get_function_argument_names
 from anntools.cooperation import TupleCooperation
@@ -92,9 +93,15 @@ from anntools.annotation import AnnotationDecorator
 __all__=[
     'ConversionError', 'Converter',
     'AsBool', 'AsInt', 'AsFloat', 'AsBytes', 'AsStr', 'AsUnicode',
-    'ConversionDecorator', 'convert'
+    'convert_many', 'ConversionDecorator', 'convert'
 ]
 
+# Name of the converted function used in error messages
+_fn_name=attrgetter('__name__')
+
+# Bound once, used whenever a conversion fails
+_exc_info=sys.exc_info
+
 # Note: Converters are named As* to allow global usage in conjunction with
 # the validation module and express their converting behavior.
 
@@ -113,6 +120,7 @@ class ConversionError(ValueError):
 
 class Converter(object):
     '''Abstract base class'''
+    __slots__=('allow_none',)
     # The exception class to be raised when the conversion fails.
     # Re-raises the original exception from the converter's code instead
     # of raising ConversionError if this is set to None. Setting this in
@@ -135,7 +143,7 @@ class Converter(object):
         called for complex converters when used in class form. Override this
         class method in subclasses to implement specific conversion logic.
         Returns the converted value.'''
-        assert NotImplementedError()
+        raise NotImplementedError
     def __init__(self, allow_none=False):
         self.allow_none=allow_none
     def convert(self, value):
@@ -145,11 +153,36 @@ class Converter(object):
         Override this class method in subclasses to implement specific
         conversion logic. You can store arguments for conversion in the
         converter object (instance). Returns the converted value.'''
-        assert NotImplementedError()
+        raise NotImplementedError
+    def _resolve(self):
+        '''Returns the callable doing the same conversion as the convert
+        method. Converters can return a faster callable specialized for their
+        arguments, which are not expected to change after the function has
+        been wrapped.'''
+        return self.convert
+
+def _allow_none(function):
+    '''Returns a callable converting values by function, but passing None.'''
+    def convert(value):
+        if value is None:
+            return None
+        return function(value)
+    return convert
+
+def _compile_converter(converter, classtype=type(object)):
+    '''Resolves a Converter class or instance to the callable converting a
+    value with it, the same way as Converter.call does on every call.
+    Returns None for foreign annotation objects, which leave values as is.'''
+    if type(converter) is classtype and issubclass(converter, Converter):
+        return _BUILTIN_CONVERSIONS.get(converter) or converter._convert
+    if isinstance(converter, Converter):
+        return converter._resolve()
+    return None
 
 #----------------------------------------------------------------------------
 
 class AsBool(Converter):
+    __slots__=()
     @classmethod
     def _convert(cls, value):
         return bool(value)
@@ -157,10 +190,18 @@ class AsBool(Converter):
         if self.allow_none and value is None:
             return None
         return bool(value)
+    def _resolve(self):
+        if type(self).convert is not AsBool.convert:
+            # Overridden in a subclass
+            return self.convert
+        if self.allow_none:
+            return _allow_none(bool)
+        return bool
 
 #----------------------------------------------------------------------------
 
 class AsInt(Converter):
+    __slots__=()
     @classmethod
     def _convert(cls, value):
         return int(value)
@@ -168,10 +209,18 @@ class AsInt(Converter):
         if self.allow_none and value is None:
             return None
         return int(value)
+    def _resolve(self):
+        if type(self).convert is not AsInt.convert:
+            # Overridden in a subclass
+            return self.convert
+        if self.allow_none:
+            return _allow_none(int)
+        return int
 
 #----------------------------------------------------------------------------
 
 class AsFloat(Converter):
+    __slots__=()
     @classmethod
     def _convert(cls, value):
         return float(value)
@@ -179,97 +228,94 @@ class AsFloat(Converter):
         if self.allow_none and value is None:
             return None
         return float(value)
+    def _resolve(self):
+        if type(self).convert is not AsFloat.convert:
+            # Overridden in a subclass
+            return self.convert
+        if self.allow_none:
+            return _allow_none(float)
+        return float
 
 #----------------------------------------------------------------------------
 
-# For Python 2.4-2.6
-if sys.version_info[0]<3:
-    class AsStr(Converter):
-        @classmethod
-        def _convert(cls, value):
-            if isinstance(value, str):
-                return value
-            if isinstance(value, unicode):
-                return value.encode('utf8')
-            return str(value)
-        def __init__(self, allow_none=False, encoding='utf8'):
-            Converter.__init__(self, allow_none)
-            self.encoding=encoding
-        def convert(self, value):
-            if self.allow_none and value is None:
-                return None
-            if isinstance(value, str):
-                return value
-            if isinstance(value, unicode):
-                return value.encode(self.encoding)
-            return str(value)
-    class AsUnicode(Converter):
-        @classmethod
-        def _convert(cls, value):
-            if isinstance(value, unicode):
-                return value
-            if isinstance(value, str):
-                return value.decode('utf8')
-            return unicode(value)
-        def __init__(self, allow_none=False, encoding='utf8'):
-            Converter.__init__(self, allow_none)
-            self.encoding=encoding
-        def convert(self, value):
-            if self.allow_none and value is None:
-                return None
-            if isinstance(value, unicode):
-                return value
-            if isinstance(value, str):
-                return value.decode(self.encoding)
-            return unicode(value)
-    class AsBytes(AsStr):
-        pass
+class AsBytes(Converter):
+    __slots__=('encoding',)
+    @classmethod
+    def _convert(cls, value):
+        if type(value) is bytes or isinstance(value, bytes):
+            return value
+        if isinstance(value, str):
+            return value.encode('utf8')
+        raise ValueError()
+    def __init__(self, allow_none=False, encoding='utf8'):
+        Converter.__init__(self, allow_none)
+        self.encoding=encoding
+    def convert(self, value):
+        if self.allow_none and value is None:
+            return None
+        if type(value) is bytes or isinstance(value, bytes):
+            return value
+        if isinstance(value, str):
+            return value.encode(self.encoding)
+        raise ValueError()
 
 #----------------------------------------------------------------------------
 
-# For Python 3.0
-if sys.version_info[0]>=3:
-    class AsBytes(Converter):
-        @classmethod
-        def _convert(cls, value):
-            if isinstance(value, bytes):
-                return value
-            if isinstance(value, str):
-                return value.encode('utf8')
-            raise ValueError()
-        def __init__(self, allow_none=False, encoding='utf8'):
-            Converter.__init__(self, allow_none)
-            self.encoding=encoding
-        def convert(self, value):
-            if self.allow_none and value is None:
-                return None
-            if isinstance(value, bytes):
-                return value
-            if isinstance(value, str):
-                return value.encode(self.encoding)
-            raise ValueError()
-    class AsStr(Converter):
-        @classmethod
-        def _convert(cls, value):
-            if isinstance(value, str):
-                return value
-            if isinstance(value, bytes):
-                return value.decode('utf8')
-            return str(value)
-        def __init__(self, allow_none=False, encoding='utf8'):
-            Converter.__init__(self, allow_none)
-            self.encoding=encoding
-        def convert(self, value):
-            if self.allow_none and value is None:
-                return None
-            if isinstance(value, str):
-                return value
-            if isinstance(value, bytes):
-                return value.decode(self.encoding)
-            return str(value)
-    class AsUnicode(AsStr):
-        pass
-    
+class AsStr(Converter):
+    __slots__=('encoding',)
+    @classmethod
+    def _convert(cls, value):
+        if type(value) is str or isinstance(value, str):
+            return value
+        if isinstance(value, bytes):
+            return value.decode('utf8')
+        return str(value)
+    def __init__(self, allow_none=False, encoding='utf8'):
+        Converter.__init__(self, allow_none)
+        self.encoding=encoding
+    def convert(self, value):
+        if self.allow_none and value is None:
+            return None
+        if type(value) is str or isinstance(value, str):
+            return value
+        if isinstance(value, bytes):
+            return value.decode(self.encoding)
+        return str(value)
+
+#----------------------------------------------------------------------------
+
+class AsUnicode(AsStr):
+    __slots__=()
+
+#----------------------------------------------------------------------------
+
+# Builtins doing the same conversion as the class form of simple converters
+_BUILTIN_CONVERSIONS={AsBool:bool, AsInt:int, AsFloat:float}
+
+#============================================================================
+# Batch conversion
+
+def convert_many(converter, values):
+    '''Converts all items of an iterable by a Converter class or instance
+    and returns the list of converted values. The converter is resolved only
+    once, then applied by map, which is much faster than calling a converted
+    function for each item. Foreign objects leave the values as is.
+    Raises ConversionError if any of the values fails to convert.'''
+    convert=_compile_converter(converter)
+    if convert is None:
+        return list(values)
+    try:
+        return list(map(convert, values))
+    except Exception:
+        if isinstance(converter, Converter):
+            converter=converter.__class__
+        if converter._exception_class is None:
+            # Reraise the converter's error
+            raise
+        exc=ConversionError('Error converting values by %s converter'%converter.__name__)
+        exc.original_exc=_exc_info()
+        raise exc
+
 #============================================================================
 
 class ConversionDecorator(AnnotationDecorator):
@@ -287,43 +333,122 @@ class ConversionDecorator(AnnotationDecorator):
         if converter._exception_class is None:
             # Reraise the converter's error
             raise
-        if sys.version_info[0]<3:
-            fn_name=fn.func_name
-        else:
-            fn_name=fn.__name__
+        fn_name=_fn_name(fn)
         if name=='return':
             exc=ConversionError('Error converting return value of function %r by %s converter: return value = %r'%(fn_name, converter.__name__, value))
         else:
             exc=ConversionError('Error converting argument %r of function %r by %s converter: %s = %r'%(name, fn_name, converter.__name__, name, value))
-        exc.original_exc=sys.exc_info()
+        exc.original_exc=_exc_info()
         raise exc
-    def convertArgument(self, fn, cooperation, name, value):
-        '''Convert an argument with it's converters.
-        Raises ConversionError if the conversion fails.'''
-        cooperation.key=name
-        for converter in cooperation:
+    def collect(self, annotations):
+        '''Returns a dictionary mapping each annotated name to a tuple of
+        (converter, convert) pairs, where convert is the callable resolved by
+        _compile_converter. Foreign annotation objects are left out, so are
+        names without converters.'''
+        collected=AnnotationDecorator.collect(self, annotations)
+        for name, objs in list(collected.items()):
+            pairs=[]
+            for converter in objs:
+                convert=_compile_converter(converter)
+                if convert is not None:
+                    pairs.append((converter, convert))
+            if pairs:
+                collected[name]=tuple(pairs)
+            else:
+                del collected[name]
+        return collected
+    def convertArgument(self, fn, converters, name, value):
+        '''Convert an argument with the (converter, convert) pairs collected
+        for it. Raises ConversionError if the conversion fails.'''
+        if len(converters)==1:
+            # Single converter, no loop required
+            converter, convert=converters[0]
             try:
-                value=Converter.call(converter, value)
+                return convert(value)
             except Exception:
                 self.raiseError(fn, converter, name, value)
+        try:
+            for converter, convert in converters:
+                value=convert(value)
+        except Exception:
+            self.raiseError(fn, converter, name, value)
         return value
+    def generateCheck(self, name, objs, variable, namespace):
+        '''Returns source code replacing the value of the local variable by
+        calling the convert callables in sequence, each in it's own try block
+        to report the failing converter. The builtin is referenced by a
+        reserved name, since arguments can shadow it.'''
+        namespace['_anntools_raise']=self.raiseError
+        namespace['_anntools_Exception']=Exception
+        lines=[]
+        for converter, convert in objs:
+            converter_key='_anntools_%d'%len(namespace)
+            namespace[converter_key]=converter
+            convert_key='_anntools_%d'%len(namespace)
+            namespace[convert_key]=convert
+            lines.append('try:')
+            lines.append('    %s=%s(%s)'%(variable, convert_key, variable))
+            lines.append('except _anntools_Exception:')
+            lines.append('    _anntools_raise(_anntools_fn, %s, %r, %s)'%(converter_key, name, variable))
+        return '\n'.join(lines)
     def wrap(self, fn, ofn):
-        '''Wraps the function to provide conversion.'''
+        '''Wraps the function to provide conversion. Functions with a plain
+        argument list get a wrapper generated for their arguments, all other
+        functions a generic wrapper.'''
+        wrapper=self.compileWrapper(fn, ofn, self.convertArgument)
+        if wrapper is not None:
+            return wrapper
         argnames=get_function_argument_names(ofn)
+        # Converters are collected when the function is wrapped and
+        # each time annotations are added by decorators applied later.
+        # The wrapper reads the whole plan from a single closure cell.
+        state=None
+        def refresh():
+            '''Collects the converters of the function.'''
+            nonlocal state
+            plan=self.collect(ofn.__annotations__)
+            # Positions of the arguments with converters only
+            positional_plan=tuple([
+                (index, name, plan[name])
+                for index, name in enumerate(argnames) if name in plan
+            ])
+            # Annotated names which can be passed by keyword, None if there
+            # are none, so the keyword arguments need not be looked at
+            keyword_plan=dict([(name, objs) for name, objs in plan.items() if name!='return']) or None
+            state=(keyword_plan, positional_plan, plan.get('return'))
+        refresh()
+        # Bound methods are looked up only once
+        convertArgument=self.convertArgument
         @wraps(fn)
         def wrapper(*args, **kw):
             '''Wrapper to implement actual argument and return value
             conversion. The @wraps decorator is required to preserve
             function module, name and docstring.'''
-            cooperation=self.cooperate(ofn.__annotations__)
-            # Convert positional arguments
-            args=[self.convertArgument(fn, cooperation, name, value) for name, value in zip(argnames, args)]
-            # Convert keyword arguments
-            kw=dict([(name, self.convertArgument(fn, cooperation, name, value)) for name, value in kw.items()])
-            # Call original function
+            keyword_plan, positional_plan, return_converters=state
+            # Convert positional arguments, arguments without converters
+            # (including variable ones) are passed as is
+            if positional_plan and args:
+                args=list(args)
+                count=len(args)
+                for index, name, converters in positional_plan:
+                    if index<count:
+                        args[index]=convertArgument(fn, converters, name, args[index])
+            # Convert keyword arguments in place, the dictionary is created
+            # for this call only and replacing values does not disturb the
+            # iteration over it
+            if kw and keyword_plan is not None:
+                for name, value in kw.items():
+                    converters=keyword_plan.get(name)
+                    if converters is not None:
+                        kw[name]=convertArgument(fn, converters, name, value)
+            # Call original function, nothing to do after it without
+            # return value annotation
+            if return_converters is None:
+                return fn(*args, **kw)
             return_value=fn(*args, **kw)
             # Convert return value
-            return self.convertArgument(fn, cooperation, 'return', return_value)
+            return convertArgument(fn, return_converters, 'return', return_value)
+        self.watch(ofn, wrapper, refresh)
         return wrapper
 
 #============================================================================
@@ -52,6 +52,26 @@ __all__=[
     'DictCooperation',
 ]
 
+#============================================================================
+# Marker for missing object space entries (allows a single dictionary lookup)
+
+_MISSING=object()
+
+#============================================================================
+# Helpers
+
+def _flatten(items, seqtype):
+    '''Returns the objects of a possibly nested sequence as a list. Nested
+    sequences of the given type are expanded in place without recursion.'''
+    items=list(items)
+    i=0
+    while i<len(items):
+        if isinstance(items[i], seqtype):
+            items[i:i+1]=items[i]
+        else:
+            i+=1
+    return items
+
 #============================================================================
 # Exceptions
 
@@ -110,7 +130,8 @@ class Cooperation(object):
     object keys or even object spaces. The class filter should not be
     modified. While this is technically possible it would change the set of
     accepted objects in a counter-intuitive way.'''
-    # NOTE: __slots__ should be defined for each subclass for performance
+    # NOTE: __slots__ should be defined for each subclass for performance,
+    # subclasses must only list their additional attributes (if any)
     __slots__=['space', 'key', 'classfilter']
     def __init__(self, space, key, classfilter=object):
         '''Initialize cooperation for a given object space and object key.
@@ -124,8 +145,8 @@ class Cooperation(object):
         self.space=space
         self.key=key
         self.classfilter=classfilter
-    # Informational methods
-    def iter(self):
+    # Informational methods (set like interface)
+    def __iter__(self):
         '''Iterates on stored objects. Yields only those instances that fit
         the class filter, which is an easy way to separate objects belonging
         to differenct tools or serving different purposes. Note that the
@@ -136,13 +157,10 @@ class Cooperation(object):
         It's not recommended to store built-in Python objects, since they
         are universal and cannot be associated for a single purpose.'''
         raise NotImplementedError()
-    def len(self):
+    def __len__(self):
         '''Returns the total number of objects could be iterated.'''
-        cnt=0
-        for obj in self:
-            cnt+=1
-        return cnt
-    def contains(self, obj):
+        return sum(1 for obj in self)
+    def __contains__(self, obj):
         '''Returns True if the object space contains the given object.
         Always returns False, if the object does not fit the class filter.
         @param obj: Object to search for.'''
@@ -150,10 +168,10 @@ class Cooperation(object):
             for o in self:
                 if o is obj: return True
         return False
-    # Provides a set like interface
-    __iter__=iter
-    __len__=len
-    __contains__=contains
+    # Named aliases of the set like interface
+    iter=__iter__
+    len=__len__
+    contains=__contains__
     # Set like manipulation methods
     def add(self, obj):
         '''Adds an object. Does not guarantee, that the object is unique,
@@ -187,14 +205,16 @@ class Cooperation(object):
 class NoCooperation(Cooperation):
     '''No cooperation allowed. At most one object can be stored. Trying to
     add a second object will raise NoCooperationError.'''
-    __slots__=['space', 'key', 'classfilter']
-    def iter(self):
+    __slots__=()
+    def __iter__(self):
         '''Yields at most one object.'''
-        if self.key in self.space:
-            obj=self.space[self.key]
-            if isinstance(obj, self.classfilter):
-                yield obj
-    __iter__=iter
+        obj=self.space.get(self.key, _MISSING)
+        if obj is _MISSING:
+            return
+        classfilter=self.classfilter
+        if classfilter is object or isinstance(obj, classfilter):
+            yield obj
+    iter=__iter__
     def add(self, obj):
         '''Stores the object. Raises NoCooperationError if an existing object
         is about to be overwritten. Raises ValueError if the object does not
@@ -219,7 +239,7 @@ class NoCooperation(Cooperation):
         '''
         if not isinstance(obj, self.classfilter):
             raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, self.classfilter))
-        if self.key in self.space and self.space[self.key] is obj:
+        if self.space.get(self.key, _MISSING) is obj:
             del self.space[self.key]
 
 #----------------------------------------------------------------------------
@@ -233,20 +253,52 @@ class TupleCooperation(Cooperation):
     performance as long as the number of objects is not very high. This is
     also a convenient scheme if you have to specify a singel object or a
     tuple of objects by hand as in the case of function annotations.'''
-    __slots__=['space', 'key', 'classfilter']
-    def iter(self):
+    __slots__=()
+    def __iter__(self):
         '''Yields all stored objects fitting the class filter.'''
-        if self.key not in self.space:
+        storage=self.space.get(self.key, _MISSING)
+        if storage is _MISSING:
             return
-        storage=self.space[self.key]
         classfilter=self.classfilter
         if isinstance(storage, tuple):
+            if classfilter is object:
+                # Every object fits, no need to filter
+                yield from storage
+                return
+            _isinstance=isinstance
             for obj in storage:
-                if isinstance(obj, classfilter):
+                if _isinstance(obj, classfilter):
                     yield obj
-        elif isinstance(storage, classfilter):
+        elif classfilter is object or isinstance(storage, classfilter):
             yield storage
-    __iter__=iter
+    iter=__iter__
+    def __len__(self):
+        '''Returns the number of stored objects fitting the class filter.
+        Counts the storage directly if there is no class filter.'''
+        if self.classfilter is not object:
+            return Cooperation.__len__(self)
+        storage=self.space.get(self.key, _MISSING)
+        if storage is _MISSING:
+            return 0
+        if isinstance(storage, tuple):
+            return len(storage)
+        return 1
+    len=__len__
+    def __contains__(self, obj):
+        '''Returns True if the object space contains the given object.
+        Always returns False, if the object does not fit the class filter.
+        Searches the storage directly by identity.
+        @param obj: Object to search for.'''
+        if not isinstance(obj, self.classfilter):
+            return False
+        storage=self.space.get(self.key, _MISSING)
+        if isinstance(storage, tuple):
+            for o in storage:
+                if o is obj:
+                    return True
+            return False
+        return storage is obj
+    contains=__contains__
     def add(self, obj):
         '''Adds the object, introduces a tuple as storage object if more than
         one objects are stored in the object space. Adding a tuple appends
@@ -255,21 +307,44 @@ class TupleCooperation(Cooperation):
         @raise ValueError: Raised when the object to be added does not fit the class filter.
         '''
         if isinstance(obj, tuple):
-            for o in obj:
-                self.add(o)
+            self._add_many(obj)
+            return
+        classfilter=self.classfilter
+        if classfilter is not object and not isinstance(obj, classfilter):
+            raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, classfilter))
+        space=self.space
+        key=self.key
+        storage=space.get(key, _MISSING)
+        if storage is _MISSING:
+            # Fast path: the first object stored for the key (common case)
+            space[key]=obj
+            return
+        if isinstance(storage, tuple):
+            space[key]=storage+(obj,)
+        else:
+            space[key]=(storage, obj)
+    def _add_many(self, objs):
+        '''Adds the contents of a tuple with a single update of the object
+        space. No object is added if any of them does not fit the filter.'''
+        items=tuple(_flatten(objs, tuple))
+        classfilter=self.classfilter
+        for obj in items:
+            if not isinstance(obj, classfilter):
+                raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, classfilter))
+        if not items:
             return
-        if not isinstance(obj, self.classfilter):
-            raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, self.classfilter))
         space=self.space
         key=self.key
-        if key in space:
-            storage=space[key]
-            if isinstance(storage, tuple):
-                space[key]=storage+(obj,)
+        storage=space.get(key, _MISSING)
+        if storage is _MISSING:
+            if len(items)<2:
+                space[key]=items[0]
             else:
-                space[key]=(storage, obj)
+                space[key]=items
+        elif isinstance(storage, tuple):
+            space[key]=storage+items
         else:
-            space[key]=obj
+            space[key]=(storage,)+items
     def remove(self, obj):
         '''Removes an object from the object space.
         Replaces tuple by a single object if only one object left.
@@ -285,18 +360,27 @@ class TupleCooperation(Cooperation):
             raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, self.classfilter))
         space=self.space
         key=self.key
-        if key not in space:
+        storage=space.get(key, _MISSING)
+        if storage is _MISSING:
             return
-        storage=space[key]
         if isinstance(storage, tuple):
-            filtered=[a for a in storage if a is not obj]
-            if len(filtered)<len(storage):
-                if not filtered:
-                    del space[key]
-                elif len(filtered)<2:
-                    space[key]=filtered[0]
-                else:
-                    space[key]=tuple(filtered)
+            # Find the object by identity, nothing to do if it's not stored
+            for i, o in enumerate(storage):
+                if o is obj:
+                    break
+            else:
+                return
+            tail=storage[i+1:]
+            if any(o is obj for o in tail):
+                # The same object is stored more than once (rare)
+                tail=tuple([o for o in tail if o is not obj])
+            storage=storage[:i]+tail
+            if not storage:
+                del space[key]
+            elif len(storage)<2:
+                space[key]=storage[0]
+            else:
+                space[key]=storage
         elif storage is obj:
             del space[key]
 
@@ -304,20 +388,52 @@ class TupleCooperation(Cooperation):
 
 class ListCooperation(Cooperation):
     '''Cooperation scheme that stores objects in a list.'''
-    __slots__=['space', 'key', 'classfilter']
-    def iter(self):
+    __slots__=()
+    def __iter__(self):
         '''Yields all stored objects fitting the class filter.'''
-        if self.key not in self.space:
+        storage=self.space.get(self.key, _MISSING)
+        if storage is _MISSING:
             return
-        storage=self.space[self.key]
         classfilter=self.classfilter
         if isinstance(storage, list):
+            if classfilter is object:
+                # Every object fits, no need to filter
+                yield from storage
+                return
+            _isinstance=isinstance
             for obj in storage:
-                if isinstance(obj, classfilter):
+                if _isinstance(obj, classfilter):
                     yield obj
-        elif isinstance(storage, classfilter):
+        elif classfilter is object or isinstance(storage, classfilter):
             yield storage
-    __iter__=iter
+    iter=__iter__
+    def __len__(self):
+        '''Returns the number of stored objects fitting the class filter.
+        Counts the storage directly if there is no class filter.'''
+        if self.classfilter is not object:
+            return Cooperation.__len__(self)
+        storage=self.space.get(self.key, _MISSING)
+        if storage is _MISSING:
+            return 0
+        if isinstance(storage, list):
+            return len(storage)
+        return 1
+    len=__len__
+    def __contains__(self, obj):
+        '''Returns True if the object space contains the given object.
+        Always returns False, if the object does not fit the class filter.
+        Searches the storage directly by identity.
+        @param obj: Object to search for.'''
+        if not isinstance(obj, self.classfilter):
+            return False
+        storage=self.space.get(self.key, _MISSING)
+        if isinstance(storage, list):
+            for o in storage:
+                if o is obj:
+                    return True
+            return False
+        return storage is obj
+    contains=__contains__
     def add(self, obj):
         '''Adds the object, introduces a list as storage object if more than
         one objects are stored in the object space. Adding a list appends
@@ -326,21 +442,42 @@ class ListCooperation(Cooperation):
         @raise ValueError: Raised when the object to be added does not fit the class filter.
         '''
         if isinstance(obj, list):
-            for o in obj:
-                self.add(o)
+            self._add_many(obj)
             return
         if not isinstance(obj, self.classfilter):
             raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, self.classfilter))
         space=self.space
         key=self.key
-        if key in space:
-            storage=space[key]
-            if isinstance(storage, list):
-                storage.append(obj)
+        storage=space.get(key, _MISSING)
+        if storage is _MISSING:
+            space[key]=obj
+        elif isinstance(storage, list):
+            storage.append(obj)
+        else:
+            space[key]=[storage, obj]
+    def _add_many(self, objs):
+        '''Adds the contents of a list with a single update of the object
+        space. No object is added if any of them does not fit the filter.'''
+        items=_flatten(objs, list)
+        classfilter=self.classfilter
+        for obj in items:
+            if not isinstance(obj, classfilter):
+                raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, classfilter))
+        if not items:
+            return
+        space=self.space
+        key=self.key
+        storage=space.get(key, _MISSING)
+        if storage is _MISSING:
+            if len(items)<2:
+                space[key]=items[0]
             else:
-                space[key]=[storage, obj]
+                space[key]=items
+        elif isinstance(storage, list):
+            storage.extend(items)
         else:
-            space[key]=obj
+            items.insert(0, storage)
+            space[key]=items
     def remove(self, obj):
         '''Removes an object from the object space.
         Replaces list by a single object if only one object left.
@@ -356,13 +493,12 @@ class ListCooperation(Cooperation):
             raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, self.classfilter))
         space=self.space
         key=self.key
-        if key not in space:
+        storage=space.get(key, _MISSING)
+        if storage is _MISSING:
             return
-        storage=space[key]
         if isinstance(storage, list):
-            idx=[i for i,o in enumerate(storage) if o is obj]
-            for i in idx:
-                del storage[i]
+            # Single pass, removes all references to the object
+            storage[:]=[o for o in storage if o is not obj]
             if not storage:
                 del space[key]
             elif len(storage)<2:
@@ -379,22 +515,24 @@ class DictCooperation(Cooperation):
     object can be stored by this scheme for each cooperative partner using
     different storage keys. This scheme does not allow single objects in the
     objects space. The object space can only contain dictionaries.'''
-    __slots__=['space', 'key', 'classfilter', 'storekey']
+    __slots__=('storekey',)
     def __init__(self, space, key, storekey, classfilter=object):
         '''Initialize cooperation scheme.
         @param storekey Hashable key to identify our object in the object storage.
         '''
         Cooperation.__init__(self, space, key, classfilter)
         self.storekey=storekey
-    def iter(self):
+    def __iter__(self):
         '''Yields a single object if exists.'''
-        if self.key in self.space:
-            storage=self.space[self.key]
-            if self.storekey in storage:
-                obj=storage[self.storekey]
-                if isinstance(obj, self.classfilter):
-                    yield obj
-    __iter__=iter
+        storage=self.space.get(self.key, _MISSING)
+        if isinstance(storage, dict):
+            obj=storage.get(self.storekey, _MISSING)
+            if obj is _MISSING:
+                return
+            classfilter=self.classfilter
+            if classfilter is object or isinstance(obj, classfilter):
+                yield obj
+    iter=__iter__
     def add(self, obj):
         '''Adds a new object. Introduces a dictionary into the object space
         if no object already exists with the object key. Raises ValueError
@@ -411,16 +549,16 @@ class DictCooperation(Cooperation):
             raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, self.classfilter))
         space=self.space
         key=self.key
-        if key in space:
-            storage=space[key]
-            if not isinstance(storage, dict):
-                raise DictCooperationFailed('Incompatible object found in object space! Dicionary cooperation failed. key=%r'%(self.key,))
-            storekey=self.storekey
-            if storekey in storage:
-                raise DictCooperationError('Trying to overwrite an existing object! key=%r, storekey=%r'%(self.key, self.storekey))
-            storage[storekey]=obj
-        else:
-            space[key]={self.storekey:obj}            
+        storage=space.get(key, _MISSING)
+        if storage is _MISSING:
+            space[key]={self.storekey:obj}
+            return
+        if not isinstance(storage, dict):
+            raise DictCooperationFailed('Incompatible object found in object space! Dicionary cooperation failed. key=%r'%(self.key,))
+        storekey=self.storekey
+        if storekey in storage:
+            raise DictCooperationError('Trying to overwrite an existing object! key=%r, storekey=%r'%(self.key, self.storekey))
+        storage[storekey]=obj
     def remove(self, obj):
         '''Removes the given object.
         @param obj: The object to be removed.
@@ -430,14 +568,12 @@ class DictCooperation(Cooperation):
             raise ValueError('Object does not fit the class filter: key=%r, classfilter=%r'%(self.key, self.classfilter))
         space=self.space
         key=self.key
-        if key in space:
-            storage=space[key]
-            if not isinstance(storage, dict):
-                raise DictCooperationFailed('Incompatible object found in object space! Dicionary cooperation failed. key=%r'%(self.key,))
-            storekey=self.storekey
-            if storekey in storage:
-                del storage[storekey]
-                if not storage:
-                    del space[key]
+        storage=space.get(key, _MISSING)
+        if storage is _MISSING:
+            return
+        if not isinstance(storage, dict):
+            raise DictCooperationFailed('Incompatible object found in object space! Dicionary cooperation failed. key=%r'%(self.key,))
+        if storage.pop(self.storekey, _MISSING) is not _MISSING and not storage:
+            del space[key]
 
 #============================================================================
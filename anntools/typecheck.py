@@ -65,13 +65,20 @@ provides security) from the ones you use for debugging and type information
 only. Such a solution allows you to preserve only the essential ones, while
 removing all the others.
 
+Setting the ANNTOOLS_VALIDATION environment variable to 0 (or
+ANNTOOLS_DISABLE_VALIDATE to 1) turns all type checking decorators into such
+identity decorators. Annotations are still recorded, but functions are not
+wrapped. Decorators can be enabled individually by setting their _enabled
+attribute to True, for example:
+
+essential=TypeCheckDecorator(NoCooperation)
+essential._enabled=True
+
 '''
 
 #============================================================================
 
-import sys
-
-from anntools.common import wraps, get_function_argument_names
+from anntools.common import VALIDATION_ENABLED, wraps, get_function_argument_names
 from anntools.cooperation import NoCooperation
 from anntools.annotation import AnnotationDecorator
 
@@ -82,6 +89,17 @@ __all__=['TypeCheckDecorator', 'typecheck']
 
 #============================================================================
 
+def _is_type(obj):
+    '''Returns True if the object can be used as the second argument of
+    isinstance (classes, abstract base classes, union types).'''
+    try:
+        isinstance(None, obj)
+    except TypeError:
+        return False
+    return True
+
+#============================================================================
+
 class TypeCheckDecorator(AnnotationDecorator):
     '''Decorator for type checking at function boundaries. Instances are
     function decorators to be used with all functions require type checking.
@@ -90,49 +108,105 @@ class TypeCheckDecorator(AnnotationDecorator):
     decorator even with Py3K. If you annotate the function and forget to add
     the decorator, the type checking will not happen.'''
     _classfilter=object
+    _merge_stacked=True
+    # Functions are not wrapped if disabled, see VALIDATION_ENABLED
+    _enabled=VALIDATION_ENABLED
     def raiseError(self, fn, types, name, value):
-        '''Raises ValidationError for an argument or return value.'''
+        '''Raises TypeError for an argument or return value.'''
         if isinstance(types, (tuple, list)):
-            typenames=', '.join([repr(validator) for type in types])
+            typenames=', '.join([repr(type) for type in types])
         else:
             typenames=repr(types)
-        if sys.version_info[0]<3:
-            fn_name=fn.func_name
-        else:
-            fn_name=fn.__name__
+        fn_name=fn.__name__
         if name=='return':
             raise TypeError('Error checking type of return value of function %r with %s type(s): return value = %r'%(fn_name, typenames, value))
         else:
             raise TypeError('Error checking type of argument %r of function %r with %s type(s): %s = %r'%(name, fn_name, typenames, name, value))
-    def checkArgument(self, fn, cooperation, name, value):
-        '''Check type an argument. Raises TypeError if the type check fails.'''
-        # Try to validate with each validator
-        cooperation.key=name
-        for types in cooperation:
-            if isinstance(value, types):
-                return
+    def collect(self, annotations):
+        '''Returns a dictionary mapping each annotated name to a flat tuple
+        of all the types it's annotated with. The tuple can be passed to
+        isinstance directly. Annotation objects not accepted by isinstance
+        are skipped, names without any types are left out.'''
+        collected=AnnotationDecorator.collect(self, annotations)
+        for name, objs in list(collected.items()):
+            types=[]
+            for obj in objs:
+                if isinstance(obj, tuple):
+                    types.extend(obj)
+                else:
+                    types.append(obj)
+            types=tuple([t for t in types if _is_type(t)])
+            if types:
+                collected[name]=types
+            else:
+                del collected[name]
+        return collected
+    def checkArgument(self, fn, types, name, value):
+        '''Check type an argument. Raises TypeError if the value is not an
+        instance of any of the types.'''
+        if not isinstance(value, types):
             self.raiseError(fn, types, name, value)
+    def generateCheck(self, name, objs, variable, namespace):
+        '''Returns a line of source code calling isinstance inline with the
+        union of types, checkArgument is called only to raise the error.
+        The builtin is referenced by a reserved name, since arguments
+        can shadow it.'''
+        namespace['_anntools_isinstance']=isinstance
+        key='_anntools_%d'%len(namespace)
+        namespace[key]=objs
+        return 'if not _anntools_isinstance(%s, %s): _anntools_check(_anntools_fn, %s, %r, %s)'%(variable, key, key, name, variable)
     def wrap(self, fn, ofn):
-        '''Wraps the function to provide runtime type checking.'''
+        '''Wraps the function to provide runtime type checking. Functions
+        with a plain argument list get a wrapper generated for their
+        arguments, all other functions a generic wrapper.'''
+        if not self._enabled:
+            return fn
+        wrapper=self.compileWrapper(fn, ofn, self.checkArgument)
+        if wrapper is not None:
+            return wrapper
         argnames=get_function_argument_names(ofn)
-        @wraps(fn) 
+        # Types are collected when the function is wrapped and
+        # each time annotations are added by decorators applied later.
+        # The wrapper reads the whole plan from a single closure cell.
+        state=None
+        def refresh():
+            '''Collects the types of the function.'''
+            nonlocal state
+            plan=self.collect(ofn.__annotations__)
+            positional_plan=tuple([(name, plan.get(name)) for name in argnames])
+            # Annotated names which can be passed by keyword, None if there
+            # are none, so the keyword arguments need not be looked at
+            keyword_plan=dict([(name, objs) for name, objs in plan.items() if name!='return']) or None
+            state=(keyword_plan, positional_plan, plan.get('return'))
+        refresh()
+        checkArgument=self.checkArgument
+        @wraps(fn)
         def wrapper(*args, **kw):
             '''Wrapper to implement actual argument and return value
             type checking. The @wraps decorator is required to preserve
             function module, name and docstring.'''
-            cooperation=self.cooperate(ofn.__annotations__)
+            keyword_plan, positional_plan, return_types=state
             # Validate positional arguments
-            for name, value in zip(argnames, args):
-                self.checkArgument(fn, cooperation, name, value)
+            for (name, types), value in zip(positional_plan, args):
+                if types is not None and not isinstance(value, types):
+                    checkArgument(fn, types, name, value)
             # Validate keyword arguments
-            for name, value in kw.items():
-                self.checkArgument(fn, cooperation, name, value)
-            # Call original function
+            if kw and keyword_plan is not None:
+                for name, value in kw.items():
+                    types=keyword_plan.get(name)
+                    if types is not None and not isinstance(value, types):
+                        checkArgument(fn, types, name, value)
+            # Call original function, nothing to do after it without
+            # return value annotation
+            if return_types is None:
+                return fn(*args, **kw)
             return_value=fn(*args, **kw)
             # Validate return value
-            self.checkArgument(fn, cooperation, 'return', return_value)
+            if not isinstance(return_value, return_types):
+                checkArgument(fn, return_types, 'return', return_value)
             # Returns with the return value of the original function
             return return_value
+        self.watch(ofn, wrapper, refresh)
         return wrapper
 
 #============================================================================
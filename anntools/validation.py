@@ -87,13 +87,22 @@ provides security) from the ones you use for debugging and type information
 only. Such a solution allows you to preserve only the essential ones, while
 removing all the others.
 
+Setting the ANNTOOLS_VALIDATION environment variable to 0 (or
+ANNTOOLS_DISABLE_VALIDATE to 1) turns all validation decorators into such
+identity decorators. Annotations are still recorded, but functions are not
+wrapped. Decorators can be enabled individually by setting their _enabled
+attribute to True, for example:
+
+essential=ValidationDecorator(TupleCooperation)
+essential._enabled=True
+
 '''
 
 #============================================================================
 
-import sys
+from operator import attrgetter
 
-from anntools.common import wraps, get_function_argument_names
+from anntools.common import VALIDATION_ENABLED, wraps, get_function_argument_names
 from anntools.cooperation import TupleCooperation
 from anntools.annotation import AnnotationDecorator
 
@@ -107,23 +116,73 @@ __all__=[
     'ValidationDecorator', 'validate'
 ]
 
+# Name of the validated function used in error messages
+_fn_name=attrgetter('__name__')
+
 #============================================================================
 # Exceptions
 
+# Descriptor of the arguments stored by the exception base class
+_base_args=BaseException.args
+
 class ValidationError(ValueError):
-    '''Error raised when an argument or return value fails validation.'''
-    pass
+    '''Error raised when an argument or return value fails validation.
+    Validation wrappers pass the function name, the failed validators, the
+    argument name and value as keyword arguments. The error message is only
+    formatted from these when the error is converted to string, since
+    errors are often caught without looking at their message. The args
+    attribute is the 1-tuple of the message, as with an error raised by
+    passing the message.'''
+    def __init__(self, *args, fn_name=None, validators=(), name=None, value=None):
+        ValueError.__init__(self, *args)
+        self.fn_name=fn_name
+        self.validators=validators
+        self.name=name
+        self.value=value
+    def _get_args(self):
+        if self.fn_name is None:
+            return _base_args.__get__(self)
+        return (self.__str__(),)
+    def _set_args(self, args):
+        # The message is taken from the new arguments
+        _base_args.__set__(self, args)
+        self.fn_name=None
+    args=property(_get_args, _set_args)
+    def __repr__(self):
+        args=self.args
+        if len(args)==1:
+            return '%s(%r)'%(self.__class__.__name__, args[0])
+        return '%s%r'%(self.__class__.__name__, args)
+    def __str__(self):
+        if self.fn_name is None:
+            return ValueError.__str__(self)
+        validators=self.validators
+        validator_names=', '.join([
+            (v.__class__ if isinstance(v, Validator) else v).__name__
+            for v in validators
+        ])
+        if len(validators)>1:
+            s='s'
+        else:
+            s=''
+        name=self.name
+        if name=='return':
+            return 'Error checking return value of function %r with the %s validator%s: return value = %r'%(self.fn_name, validator_names, s, self.value)
+        return 'Error checking argument %r of function %r with the %s validator%s: %s = %r'%(name, self.fn_name, validator_names, s, name, self.value)
 
 #============================================================================
 # Validators
 
 class Validator(object):
     '''Abstract base class'''
+    __slots__=()
     @staticmethod
     def call(validator, value, classtype=type(object)):
         '''Call a Validator class or instance to validate a value.
         Returns None for foreign annotator objects or a bool as a result.'''
-        if type(validator) is classtype and issubclass(validator, Validator):
+        if type(validator) is classtype and (
+            validator in _KNOWN_VALIDATOR_CLASSES or
+            issubclass(validator, Validator)):
             return validator._check(value)
         if isinstance(validator, Validator):
             return validator.check(value)
@@ -146,234 +205,458 @@ class Validator(object):
         validator object (instance). Returns True is the value is valid,
         False if not. May not return None.'''
         assert NotImplementedError()
+    @classmethod
+    def _emit(cls, variable, namespace):
+        '''Returns the source code of a Python expression doing the same
+        check as the _check class method on the value of the local variable,
+        so generated wrappers can validate without calling the validator.
+        Objects referenced by the expression must be stored in the namespace
+        by _emit_constant. Returns None if the validator can not be inlined.
+        Only the validators defined by this module are inlined.'''
+        return None
+    def emit(self, variable, namespace):
+        '''Returns the source code of a Python expression doing the same
+        check as the check method, see _emit.'''
+        return None
+
+#----------------------------------------------------------------------------
+# Inlining validators into generated wrappers
+
+# Builtins used by emitted expressions. Generated wrappers have the
+# arguments of the wrapped function as local variables, which may hide the
+# builtins by their names.
+_EMIT_BUILTINS={
+    '_anntools_type':type, '_anntools_isinstance':isinstance,
+    '_anntools_issubclass':issubclass, '_anntools_len':len,
+}
+
+def _emit_constant(namespace, obj):
+    '''Stores an object referenced by an emitted expression in the namespace
+    and returns the name it can be accessed by.'''
+    key='_anntools_%d'%len(namespace)
+    namespace[key]=obj
+    return key
+
+def _emit_type_test(variable, cls, namespace):
+    '''Returns an expression testing the exact type of the value first, then
+    calling isinstance only for other types.'''
+    key=_emit_constant(namespace, cls)
+    return '(_anntools_type(%s) is %s or _anntools_isinstance(%s, %s))'%(variable, key, variable, key)
+
+def _emit_validator(validator, variable, namespace, classtype=type(object)):
+    '''Returns the expression emitted by a Validator class or instance
+    defined by this module or None for all other objects.'''
+    if type(validator) is classtype:
+        if validator in _KNOWN_VALIDATOR_CLASSES:
+            return validator._emit(variable, namespace)
+        return None
+    if type(validator) in _KNOWN_VALIDATOR_CLASSES:
+        return validator.emit(variable, namespace)
+    return None
+
+#----------------------------------------------------------------------------
+
+def _compile_validator(validator, classtype=type(object)):
+    '''Resolves a Validator class or instance to the callable checking a
+    value with it, the same way as Validator.call does on every call.
+    Returns None for foreign annotation objects.'''
+    if type(validator) is classtype and (
+        validator in _KNOWN_VALIDATOR_CLASSES or
+        issubclass(validator, Validator)):
+        return validator._check
+    if isinstance(validator, Validator):
+        cls=type(validator)
+        if cls in _TYPE_ONLY_CLASSES and _type_only(validator):
+            # Instances without arguments restricting the value check
+            # the same way as their class form
+            return cls._check
+        return validator.check
+    return None
 
 #----------------------------------------------------------------------------
 
 class And(Validator):
+    __slots__=('validators', '_checks', '_verdicts')
     @classmethod
     def _check(cls, *args):
         raise NotImplementedError('You have to instantiate this validator and pass child validators.')
     def __init__(self, *validators):
         '''Store child validators'''
         self.validators=validators
+        self._checks=tuple([c for c in map(_compile_validator, validators) if c is not None])
+        # Verdicts by value type if the children check only the type
+        self._verdicts={} if _type_only(self) else None
     def check(self, value, classtype=type(object)):
         '''Perform logical and on the result of child validators.
         Provides the same short-circuit behavior as the Python and operator.'''
-        for v in self.validators:
-            r=Validator.call(v, value)
+        verdicts=self._verdicts
+        if verdicts is not None:
+            if value.__class__ is not type(value):
+                # Proxy reporting an other class to isinstance
+                verdicts=None
+            else:
+                r=verdicts.get(type(value))
+                if r is not None:
+                    return r
+        result=True
+        for c in self._checks:
+            r=c(value)
             if r is not None and not r:
-                return False
-        return True
+                result=False
+                break
+        if verdicts is not None and len(verdicts)<_MAX_VERDICTS:
+            verdicts[type(value)]=result
+        return result
+    def emit(self, variable, namespace):
+        tests=[]
+        for v in self.validators:
+            if _compile_validator(v) is None:
+                # Foreign annotation object
+                continue
+            test=_emit_validator(v, variable, namespace)
+            if test is None:
+                return None
+            tests.append(test)
+        if not tests:
+            return 'True'
+        return '(%s)'%' and '.join(tests)
 
 #----------------------------------------------------------------------------
 
 class Or(Validator):
+    __slots__=('validators', '_checks', '_verdicts')
     @classmethod
     def _check(cls, *args):
         raise NotImplementedError('You have to instantiate this validator and pass child validators.')
     def __init__(self, *validators):
         '''Store child validators'''
         self.validators=validators
+        self._checks=tuple([c for c in map(_compile_validator, validators) if c is not None])
+        # Verdicts by value type if the children check only the type
+        self._verdicts={} if _type_only(self) else None
     def check(self, value, classtype=type(object)):
         '''Perform logical or on the result of child validators.
         Provides the same short-circuit behavior as the Python or operator.'''
-        for v in self.validators:
-            r=Validator.call(v, value)
+        verdicts=self._verdicts
+        if verdicts is not None:
+            if value.__class__ is not type(value):
+                # Proxy reporting an other class to isinstance
+                verdicts=None
+            else:
+                r=verdicts.get(type(value))
+                if r is not None:
+                    return r
+        result=False
+        for c in self._checks:
+            r=c(value)
             if r is not None and r:
-                return True
-        return False
+                result=True
+                break
+        if verdicts is not None and len(verdicts)<_MAX_VERDICTS:
+            verdicts[type(value)]=result
+        return result
+    def emit(self, variable, namespace):
+        tests=[]
+        for v in self.validators:
+            if _compile_validator(v) is None:
+                # Foreign annotation object
+                continue
+            test=_emit_validator(v, variable, namespace)
+            if test is None:
+                return None
+            tests.append(test)
+        if not tests:
+            return 'False'
+        return '(%s)'%' or '.join(tests)
 
 #----------------------------------------------------------------------------
 
 class Not(Validator):
+    __slots__=('validator', '_child_check')
     @classmethod
     def _check(cls, *args):
         raise NotImplementedError('You have to instantiate this validator and pass child validators.')
     def __init__(self, validator):
         '''Store child validator'''
         self.validator=validator
+        self._child_check=_compile_validator(validator)
     def check(self, value, classtype=type(object)):
         '''Perform logical not on the result of the child validator.'''
-        r=Validator.call(self.validator, value)
+        c=self._child_check
+        if c is None:
+            return None
+        r=c(value)
         if r is None:
             return None
         return not r
+    def emit(self, variable, namespace):
+        if self._child_check is None:
+            # Foreign annotation object, the check returns None
+            return None
+        test=_emit_validator(self.validator, variable, namespace)
+        if test is None:
+            return None
+        return '(not %s)'%test
 
 #----------------------------------------------------------------------------
 
 class AllowNone(Validator):
+    __slots__=()
     @classmethod
     def _check(cls, value):
         return value is None
     def check(self, value):
         return value is None
+    @classmethod
+    def _emit(cls, variable, namespace):
+        return '(%s is None)'%variable
+    def emit(self, variable, namespace):
+        return self._emit(variable, namespace)
 
 #----------------------------------------------------------------------------
 
 class Bool(Validator):
+    __slots__=()
     @classmethod
     def _check(cls, value):
-        return isinstance(value, bool)
+        # bool can not be subclassed
+        return type(value) is bool
     def check(self, value):
         return isinstance(value, bool)
+    @classmethod
+    def _emit(cls, variable, namespace):
+        return '(_anntools_type(%s) is %s)'%(variable, _emit_constant(namespace, bool))
+    def emit(self, variable, namespace):
+        return self._emit(variable, namespace)
 
 #----------------------------------------------------------------------------
 
 class Int(Validator):
+    __slots__=('min', 'max')
     @classmethod
     def _check(cls, value):
-        return isinstance(value, int) and not isinstance(value, bool)
+        t=type(value)
+        return t is int or (t is not bool and isinstance(value, int))
     def __init__(self, min=None, max=None):
         self.min=min
         self.max=max
     def check(self, value):
-        if not isinstance(value, int) or isinstance(value, bool):
+        t=type(value)
+        if t is not int and (t is bool or not isinstance(value, int)):
             return False
-        if self.min is not None and value<self.min:
+        min=self.min
+        if min is not None and value<min:
             return False
-        if self.max is not None and value>self.max:
+        max=self.max
+        if max is not None and value>max:
             return False
         return True
+    @classmethod
+    def _emit(cls, variable, namespace):
+        i=_emit_constant(namespace, int)
+        b=_emit_constant(namespace, bool)
+        return '(_anntools_type(%s) is %s or (_anntools_type(%s) is not %s and _anntools_isinstance(%s, %s)))'%(variable, i, variable, b, variable, i)
+    def emit(self, variable, namespace):
+        test=self._emit(variable, namespace)
+        if self.min is None and self.max is None:
+            return test
+        tests=[test]
+        if self.min is not None:
+            tests.append('not %s<%s'%(variable, _emit_constant(namespace, self.min)))
+        if self.max is not None:
+            tests.append('not %s>%s'%(variable, _emit_constant(namespace, self.max)))
+        return '(%s)'%' and '.join(tests)
 
 #----------------------------------------------------------------------------
 
 class Float(Validator):
+    __slots__=('min', 'max')
     @classmethod
     def _check(cls, value):
-        return isinstance(value, (int, float)) and not isinstance(value, bool)
+        t=type(value)
+        return t is float or t is int or (t is not bool and isinstance(value, (int, float)))
     def __init__(self, min=None, max=None):
         self.min=min
         self.max=max
     def check(self, value):
-        if not isinstance(value, (int, float)) or isinstance(value, bool):
+        t=type(value)
+        if t is not float and t is not int and (t is bool or not isinstance(value, (int, float))):
             return False
-        if self.min is not None and value<self.min:
+        min=self.min
+        if min is not None and value<min:
             return False
-        if self.max is not None and value>self.max:
+        max=self.max
+        if max is not None and value>max:
             return False
         return True
+    @classmethod
+    def _emit(cls, variable, namespace):
+        f=_emit_constant(namespace, float)
+        i=_emit_constant(namespace, int)
+        b=_emit_constant(namespace, bool)
+        n=_emit_constant(namespace, (int, float))
+        return '(_anntools_type(%s) is %s or _anntools_type(%s) is %s or (_anntools_type(%s) is not %s and _anntools_isinstance(%s, %s)))'%(variable, f, variable, i, variable, b, variable, n)
+    def emit(self, variable, namespace):
+        test=self._emit(variable, namespace)
+        if self.min is None and self.max is None:
+            return test
+        tests=[test]
+        if self.min is not None:
+            tests.append('not %s<%s'%(variable, _emit_constant(namespace, self.min)))
+        if self.max is not None:
+            tests.append('not %s>%s'%(variable, _emit_constant(namespace, self.max)))
+        return '(%s)'%' and '.join(tests)
 
 #----------------------------------------------------------------------------
 
 class Complex(Validator):
+    __slots__=()
     @classmethod
     def _check(cls, value):
-        return isinstance(value, complex)
+        return type(value) is complex or isinstance(value, complex)
     def check(self, value):
         return isinstance(value, complex)
+    @classmethod
+    def _emit(cls, variable, namespace):
+        return _emit_type_test(variable, complex, namespace)
+    def emit(self, variable, namespace):
+        return self._emit(variable, namespace)
+
+#----------------------------------------------------------------------------
+
+class Bytes(Validator):
+    __slots__=('maxlen',)
+    @classmethod
+    def _check(cls, value):
+        return type(value) is bytes or isinstance(value, bytes)
+    def __init__(self, maxlen=None):
+        self.maxlen=maxlen
+    def check(self, value):
+        if not isinstance(value, bytes):
+            return False
+        if self.maxlen is not None and len(value)>self.maxlen:
+            return False
+        return True
+    @classmethod
+    def _emit(cls, variable, namespace):
+        return _emit_type_test(variable, bytes, namespace)
+    def emit(self, variable, namespace):
+        test=self._emit(variable, namespace)
+        if self.maxlen is None:
+            return test
+        return '(%s and not _anntools_len(%s)>%s)'%(test, variable, _emit_constant(namespace, self.maxlen))
 
 #----------------------------------------------------------------------------
 
-# For Python 2.4-2.6
-if sys.version_info[0]<3:
-    class Str(Validator):
-        @classmethod
-        def _check(cls, value):
-            return isinstance(value, str)
-        def __init__(self, maxlen=None):
-            self.maxlen=maxlen
-        def check(self, value):
-            if not isinstance(value, str):
-                return False
-            if self.maxlen is not None and len(value)>self.maxlen:
-                return False
-            return True
-    class Unicode(Validator):
-        @classmethod
-        def _check(cls, value):
-            return isinstance(value, unicode)
-        def __init__(self, maxlen=None):
-            self.maxlen=maxlen
-        def check(self, value):
-            if not isinstance(value, unicode):
-                return False
-            if self.maxlen is not None and len(value)>self.maxlen:
-                return False
-            return True
-    class Bytes(Str):
-        pass
+class Str(Validator):
+    __slots__=('maxlen',)
+    @classmethod
+    def _check(cls, value):
+        return type(value) is str or isinstance(value, str)
+    def __init__(self, maxlen=None):
+        self.maxlen=maxlen
+    def check(self, value):
+        if not isinstance(value, str):
+            return False
+        if self.maxlen is not None and len(value)>self.maxlen:
+            return False
+        return True
+    @classmethod
+    def _emit(cls, variable, namespace):
+        return _emit_type_test(variable, str, namespace)
+    def emit(self, variable, namespace):
+        test=self._emit(variable, namespace)
+        if self.maxlen is None:
+            return test
+        return '(%s and not _anntools_len(%s)>%s)'%(test, variable, _emit_constant(namespace, self.maxlen))
 
 #----------------------------------------------------------------------------
 
-# For Python 3.0
-if sys.version_info[0]>=3:
-    class Bytes(Validator):
-        @classmethod
-        def _check(cls, value):
-            return isinstance(value, bytes)
-        def __init__(self, maxlen=None):
-            self.maxlen=maxlen
-        def check(self, value):
-            if not isinstance(value, bytes):
-                return False
-            if self.maxlen is not None and len(value)>self.maxlen:
-                return False
-            return True
-    class Str(Validator):
-        @classmethod
-        def _check(cls, value):
-            return isinstance(value, str)
-        def __init__(self, maxlen=None):
-            self.maxlen=maxlen
-        def check(self, value):
-            if not isinstance(value, str):
-                return False
-            if self.maxlen is not None and len(value)>self.maxlen:
-                return False
-            return True
-    class Unicode(Str):
-        pass
-    
+class Unicode(Str):
+    __slots__=()
+
 #----------------------------------------------------------------------------
 
 class Tuple(Validator):
+    __slots__=()
     @classmethod
     def _check(cls, value):
-        return isinstance(value, tuple)
+        return type(value) is tuple or isinstance(value, tuple)
     def check(self, value):
-        return isinstance(value, tuple)
+        return type(value) is tuple or isinstance(value, tuple)
+    @classmethod
+    def _emit(cls, variable, namespace):
+        return _emit_type_test(variable, tuple, namespace)
+    def emit(self, variable, namespace):
+        return self._emit(variable, namespace)
 
 #----------------------------------------------------------------------------
 
 class List(Validator):
+    __slots__=()
     @classmethod
     def _check(cls, value):
-        return isinstance(value, list)
+        return type(value) is list or isinstance(value, list)
     def check(self, value):
-        return isinstance(value, list)
+        return type(value) is list or isinstance(value, list)
+    @classmethod
+    def _emit(cls, variable, namespace):
+        return _emit_type_test(variable, list, namespace)
+    def emit(self, variable, namespace):
+        return self._emit(variable, namespace)
 
 #----------------------------------------------------------------------------
 
 class Dict(Validator):
+    __slots__=()
     @classmethod
     def _check(cls, value):
-        return isinstance(value, dict)
+        return type(value) is dict or isinstance(value, dict)
     def check(self, value):
-        return isinstance(value, dict)
+        return type(value) is dict or isinstance(value, dict)
+    @classmethod
+    def _emit(cls, variable, namespace):
+        return _emit_type_test(variable, dict, namespace)
+    def emit(self, variable, namespace):
+        return self._emit(variable, namespace)
 
 #----------------------------------------------------------------------------
 
 class Set(Validator):
+    __slots__=()
     @classmethod
     def _check(cls, value):
-        return isinstance(value, set)
+        return type(value) is set or isinstance(value, set)
     def check(self, value):
-        return isinstance(value, set)
+        return type(value) is set or isinstance(value, set)
+    @classmethod
+    def _emit(cls, variable, namespace):
+        return _emit_type_test(variable, set, namespace)
+    def emit(self, variable, namespace):
+        return self._emit(variable, namespace)
 
 #----------------------------------------------------------------------------
 
 class InstanceOf(Validator):
+    __slots__=('cls', '_single')
     @classmethod
     def _check(cls, value):
         raise SyntaxError('No class specified for the InstanceOf validator!')
     def __init__(self, *args):
         self.cls=args
+        # The only class if there is a single one (the usual case)
+        self._single=args[0] if len(args)==1 else None
     def check(self, value):
-        return isinstance(value, self.cls)
+        return type(value) is self._single or isinstance(value, self.cls)
+    def emit(self, variable, namespace):
+        if self._single is None:
+            return '_anntools_isinstance(%s, %s)'%(variable, _emit_constant(namespace, self.cls))
+        return _emit_type_test(variable, self._single, namespace)
 
 #----------------------------------------------------------------------------
 
 class SubclassOf(Validator):
+    __slots__=('cls',)
     @classmethod
     def _check(cls, value):
         raise SyntaxError('No class specified for the SubclassOf validator!')
@@ -381,6 +664,58 @@ class SubclassOf(Validator):
         self.cls=args
     def check(self, value, classtype=type(object)):
         return type(value) is classtype and issubclass(value, self.cls)
+    def emit(self, variable, namespace):
+        return '(_anntools_type(%s) is %s and _anntools_issubclass(%s, %s))'%(variable, _emit_constant(namespace, type(object)), variable, _emit_constant(namespace, self.cls))
+
+#----------------------------------------------------------------------------
+
+# Validator classes defined by this module, recognized by a single set lookup
+# before falling back to issubclass for user defined validators
+_KNOWN_VALIDATOR_CLASSES=frozenset([
+    And, Or, Not, AllowNone, Bool, Int, Float, Complex, Bytes, Str, Unicode,
+    Tuple, List, Dict, Set, InstanceOf, SubclassOf,
+])
+
+#----------------------------------------------------------------------------
+
+# Validator classes checking only the type of the value when used in class
+# form or in instance form without arguments restricting the value
+_TYPE_ONLY_CLASSES=frozenset([
+    AllowNone, Bool, Int, Float, Complex, Bytes, Str, Unicode,
+    Tuple, List, Dict, Set,
+])
+
+# Maximum number of value types to remember verdicts for in a composite
+# validator, protects from growing without limits on dynamic types
+_MAX_VERDICTS=64
+
+def _type_only(validator, classtype=type(object)):
+    '''Returns True if the result of a validator depends only on the exact
+    type of the value, so it can be remembered by type. InstanceOf is not
+    such a validator, since abstract base classes can be registered later.'''
+    if type(validator) is classtype:
+        return validator in _TYPE_ONLY_CLASSES
+    cls=type(validator)
+    if cls in _TYPE_ONLY_CLASSES:
+        return (
+            getattr(validator, 'min', None) is None and
+            getattr(validator, 'max', None) is None and
+            getattr(validator, 'maxlen', None) is None
+        )
+    if cls is And or cls is Or:
+        children=[v for v in validator.validators if _compile_validator(v) is not None]
+        return bool(children) and all(map(_type_only, children))
+    if cls is Not:
+        return validator._child_check is not None and _type_only(validator.validator)
+    return False
+
+#----------------------------------------------------------------------------
+
+def _allow_none_first(pair):
+    '''Sort key of (validator, check) pairs, which puts the AllowNone
+    validators first and keeps the order of all the others.'''
+    validator=pair[0]
+    return not (validator is AllowNone or type(validator) is AllowNone)
 
 #============================================================================
 
@@ -392,66 +727,119 @@ class ValidationDecorator(AnnotationDecorator):
     decorator even with Py3K. If you annotate the function and forget to add
     the decorator, the validation will not happen.'''
     _classfilter=(Validator, Validator.__class__)
+    _merge_stacked=True
+    # Functions are not wrapped if disabled, see VALIDATION_ENABLED
+    _enabled=VALIDATION_ENABLED
     def raiseError(self, fn, validators, name, value):
         '''Raises ValidationError for an argument or return value.'''
-        def validator_class(validator):
-            if isinstance(validator, Validator):
-                return validator.__class__
-            return validator
-        validator_names=', '.join([validator_class(validator).__name__ for validator in validators])
-        if len(validators)>1:
-            s='s'
-        else:
-            s=''
-        if sys.version_info[0]<3:
-            fn_name=fn.func_name
-        else:
-            fn_name=fn.__name__
-        if name=='return':
-            raise ValidationError('Error checking return value of function %r with the %s validator%s: return value = %r'%(fn_name, validator_names, s, value))
-        else:
-            raise ValidationError('Error checking argument %r of function %r with the %s validator%s: %s = %r'%(name, fn_name, validator_names, s, name, value))
-    def validateArgument(self, fn, cooperation, name, value):
-        '''Validate an argument with it's validators.
-        Raises ValidationError if there is at least one validator
-        and all validators fail.'''
+        raise ValidationError(
+            fn_name=_fn_name(fn), validators=tuple(validators), name=name, value=value
+        )
+    def collect(self, annotations):
+        '''Returns a dictionary mapping each annotated name to a tuple of
+        (validator, check) pairs, where check is the callable resolved by
+        _compile_validator. Foreign annotation objects are left out, so are
+        names without validators. AllowNone validators are moved to the
+        front, so None values are accepted without running the others.'''
+        collected=AnnotationDecorator.collect(self, annotations)
+        for name, objs in list(collected.items()):
+            pairs=[]
+            for validator in objs:
+                check=_compile_validator(validator)
+                if check is not None:
+                    pairs.append((validator, check))
+            pairs.sort(key=_allow_none_first)
+            if pairs:
+                collected[name]=tuple(pairs)
+            else:
+                del collected[name]
+        return collected
+    def validateArgument(self, fn, validators, name, value):
+        '''Validate an argument with it's validators given as the
+        (validator, check) pairs collected for the argument.
+        Raises ValidationError if all validators fail.'''
         # Try to validate against all validators
-        validators=[]
-        cooperation.key=name
-        for validator in cooperation:
-            valid=Validator.call(validator, value)
+        failed=[]
+        for validator, check in validators:
+            valid=check(value)
             if valid is None:
-                # Not a validator
+                # Composite of foreign objects only
                 continue
             if valid:
                 # Return on the first successful validation
                 return
-            validators.append(validator)
+            failed.append(validator)
         # No validators succeeded
-        if validators:
+        if failed:
             # There was at least one validator and all validators failed
-            self.raiseError(fn, validators, name, value)
+            self.raiseError(fn, failed, name, value)
+    def generateCheck(self, name, objs, variable, namespace):
+        '''Returns a line of source code validating the value inline by the
+        expressions emitted by the validators or by calling their check
+        callables if they can not be inlined. validateArgument is called
+        only if none of them succeeds to raise the error (or to skip
+        composites of foreign objects, whose checks return None).'''
+        namespace.update(_EMIT_BUILTINS)
+        key=_emit_constant(namespace, objs)
+        tests=[]
+        for validator, check in objs:
+            test=_emit_validator(validator, variable, namespace)
+            if test is None:
+                test='%s(%s)'%(_emit_constant(namespace, check), variable)
+            tests.append(test)
+        return 'if not (%s): _anntools_check(_anntools_fn, %s, %r, %s)'%(' or '.join(tests), key, name, variable)
     def wrap(self, fn, ofn):
-        '''Wraps the function to provide runtime validation.'''
+        '''Wraps the function to provide runtime validation. Functions with
+        a plain argument list get a wrapper generated for their arguments,
+        all other functions a generic wrapper.'''
+        if not self._enabled:
+            return fn
+        wrapper=self.compileWrapper(fn, ofn, self.validateArgument)
+        if wrapper is not None:
+            return wrapper
         argnames=get_function_argument_names(ofn)
+        # Validators are collected when the function is wrapped and
+        # each time annotations are added by decorators applied later.
+        # The wrapper reads the whole plan from a single closure cell.
+        state=None
+        def refresh():
+            '''Collects the validators of the function.'''
+            nonlocal state
+            plan=self.collect(ofn.__annotations__)
+            positional_plan=tuple([(name, plan.get(name)) for name in argnames])
+            # Annotated names which can be passed by keyword, None if there
+            # are none, so the keyword arguments need not be looked at
+            keyword_plan=dict([(name, objs) for name, objs in plan.items() if name!='return']) or None
+            state=(keyword_plan, positional_plan, plan.get('return'))
+        refresh()
+        # Bound methods are looked up only once
+        validateArgument=self.validateArgument
         @wraps(fn)
         def wrapper(*args, **kw):
             '''Wrapper to implement actual argument and return value
             validation. The @wraps decorator is required to preserve
             function module, name and docstring.'''
-            cooperation=self.cooperate(ofn.__annotations__)
+            keyword_plan, positional_plan, return_validators=state
             # Validate positional arguments
-            for name, value in zip(argnames, args):
-                self.validateArgument(fn, cooperation, name, value)
+            for (name, validators), value in zip(positional_plan, args):
+                if validators is not None:
+                    validateArgument(fn, validators, name, value)
             # Validate keyword arguments
-            for name, value in kw.items():
-                self.validateArgument(fn, cooperation, name, value)
-            # Call original function
+            if kw and keyword_plan is not None:
+                for name, value in kw.items():
+                    validators=keyword_plan.get(name)
+                    if validators is not None:
+                        validateArgument(fn, validators, name, value)
+            # Call original function, nothing to do after it without
+            # return value annotation
+            if return_validators is None:
+                return fn(*args, **kw)
             return_value=fn(*args, **kw)
             # Validate return value
-            self.validateArgument(fn, cooperation, 'return', return_value)
+            validateArgument(fn, return_validators, 'return', return_value)
             # Returns with the return value of the original function
             return return_value
+        self.watch(ofn, wrapper, refresh)
         return wrapper
 
 #============================================================================
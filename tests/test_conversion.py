@@ -25,22 +25,18 @@ class ConverterTestCase(TestCase):
         @convert(b=AsBool)
         def fn1(b):
             return isinstance(b, bool)
-        self.assert_(fn1(True))
-        self.assert_(fn1(1))
-        self.assert_(fn1(None))
+        self.assertTrue(fn1(True))
+        self.assertTrue(fn1(1))
+        self.assertTrue(fn1(None))
         @convert(b=AsBool(allow_none=True))
         def fn2(b):
             return b
-        self.assert_(fn2(True) is True)
-        self.assert_(fn2(1) is True)
-        self.assert_(fn2(None) is None)
+        self.assertTrue(fn2(True) is True)
+        self.assertTrue(fn2(1) is True)
+        self.assertTrue(fn2(None) is None)
         class C(object):
-            if sys.version_info[0]<3:
-                def __nonzero__(self):
-                    raise ValueError()
-            else:
-                def __bool__(self):
-                    raise ValueError()
+            def __bool__(self):
+                raise ValueError()
         @convert(b=AsBool)
         def fn3(b):
             pass
@@ -54,6 +50,19 @@ class ConverterTestCase(TestCase):
         self.assertEqual(fn1('10'), 10)
         self.assertRaises(ConversionError, fn1, 'abc')
         self.assertRaises(ConversionError, fn1, fn1)
+        @convert(i=AsInt(allow_none=True))
+        def fn2(i):
+            return i
+        self.assertEqual(fn2('10'), 10)
+        self.assertTrue(fn2(None) is None)
+        self.assertRaises(ConversionError, fn2, 'abc')
+        class AsHexInt(AsInt):
+            def convert(self, value):
+                return int(value, 16)
+        @convert(i=AsHexInt())
+        def fn3(i):
+            return i
+        self.assertEqual(fn3('10'), 16)
     def testAsFloat(self):
         @convert(f=AsFloat)
         def fn1(f):
@@ -63,54 +72,97 @@ class ConverterTestCase(TestCase):
         self.assertEqual(fn1('1.5'), 1.5)
         self.assertRaises(ConversionError, fn1, 'abc')
         self.assertRaises(ConversionError, fn1, fn1)
-    if sys.version_info[0]<3:
-        # Python 2.4-2.6
-        def testAsStr(self):            
-            class C(object):
-                def __str__(self):
-                    raise ValueError()
-            @convert(s=AsStr)
-            def fn(s):
-                return s
-            self.assertEqual(fn(''), '')
-            self.assertEqual(fn(123), '123')
-            self.assert_(isinstance(fn(123), str))
-            self.assertRaises(ConversionError, fn, C())
-        def testAsUnicode(self):
-            class C(object):
-                def __str__(self):
-                    raise ValueError()
-            @convert(s=AsUnicode)
-            def fn(s):
-                return s
-            self.assertEqual(fn(''), eval("u''"))
-            self.assertEqual(fn(123), eval("u'123'"))
-            self.assert_(isinstance(fn(123), unicode))
-            self.assertRaises(ConversionError, fn, C())
-    else:
-        # Python 3.0
-        def testAsBytes(self):            
-            class C(object):
-                def __str__(self):
-                    raise ValueError()
-            @convert(s=AsBytes)
-            def fn(s):
-                return s
-            self.assertEqual(fn(eval("b''")), eval("b''"))
-            self.assert_(isinstance(fn('abc'), bytes))
-            self.assertRaises(ConversionError, fn, 123)
-            self.assertRaises(ConversionError, fn, C())
-        def testAsStr(self):
-            class C(object):
-                def __str__(self):
-                    raise ValueError()
-            @convert(s=AsStr)
-            def fn(s):
-                return s
-            self.assertEqual(fn(''), '')
-            self.assertEqual(fn(123), '123')
-            self.assert_(isinstance(fn(123), str))
-            self.assertRaises(ConversionError, fn, C())
+    def testChain(self):
+        @convert(a=(AsFloat, AsInt))
+        def fn1(a):
+            return a
+        @convert(a=(AsFloat, AsInt))
+        def fn2(a, b=None):
+            return a
+        for fn in (fn1, fn2):
+            self.assertEqual(fn('1.5'), 1)
+            self.assertTrue(isinstance(fn('1.5'), int))
+            try:
+                fn('x')
+            except ConversionError:
+                self.assertTrue('AsFloat' in str(sys.exc_info()[1]))
+            else:
+                self.fail('ConversionError not raised')
+            try:
+                fn(float('inf'))
+            except ConversionError:
+                self.assertTrue('AsInt' in str(sys.exc_info()[1]))
+            else:
+                self.fail('ConversionError not raised')
+    def testAbstract(self):
+        @convert(a=Converter)
+        def fn1(a):
+            return a
+        self.assertRaises(ConversionError, fn1, 1)
+        @convert(a=Converter())
+        def fn2(a):
+            return a
+        self.assertRaises(ConversionError, fn2, 1)
+    def testConvertMany(self):
+        self.assertEqual(convert_many(AsInt, ['1', 2, 3.5]), [1, 2, 3])
+        self.assertEqual(convert_many(AsFloat(allow_none=True), ['1', None]), [1.0, None])
+        self.assertEqual(convert_many('foreign', ('x', 1)), ['x', 1])
+        self.assertRaises(ConversionError, convert_many, AsInt, ['1', 'x'])
+    def testGeneratedCode(self):
+        # Wrappers of functions with the same shape share their code
+        @convert(AsStr, a=AsInt)
+        def fn1(a, b):
+            return a
+        @convert(AsStr, a=AsFloat)
+        def fn2(a, b):
+            return b
+        self.assertTrue(fn1.__code__ is fn2.__code__)
+        self.assertEqual(fn1('1', 2), '1')
+        self.assertEqual(fn2('1', 2), '2')
+        # Arguments may shadow the builtins used by the generated code
+        @convert(Exception=AsInt)
+        def fn3(Exception):
+            return Exception
+        self.assertEqual(fn3('1'), 1)
+        self.assertRaises(ConversionError, fn3, 'x')
+        # Bound methods
+        class C(object):
+            def m(self, a):
+                return a
+        fn4=convert(a=AsInt)(C().m)
+        self.assertEqual(fn4('5'), 5)
+        self.assertRaises(ConversionError, fn4, 'x')
+    def testStacked(self):
+        @convert(AsStr, a=AsInt)
+        @convert(b=AsFloat)
+        def fn(a, b, *args):
+            return (a, b)+args
+        self.assertEqual(fn('1', '2'), "(1, 2.0)")
+        self.assertEqual(fn(a='1', b=2), "(1, 2.0)")
+        # Variable arguments are passed as is
+        self.assertEqual(fn('1', '2', '3'), "(1, 2.0, '3')")
+    def testAsBytes(self):            
+        class C(object):
+            def __str__(self):
+                raise ValueError()
+        @convert(s=AsBytes)
+        def fn(s):
+            return s
+        self.assertEqual(fn(b''), b'')
+        self.assertTrue(isinstance(fn('abc'), bytes))
+        self.assertRaises(ConversionError, fn, 123)
+        self.assertRaises(ConversionError, fn, C())
+    def testAsStr(self):
+        class C(object):
+            def __str__(self):
+                raise ValueError()
+        @convert(s=AsStr)
+        def fn(s):
+            return s
+        self.assertEqual(fn(''), '')
+        self.assertEqual(fn(123), '123')
+        self.assertTrue(isinstance(fn(123), str))
+        self.assertRaises(ConversionError, fn, C())
 
 #============================================================================
 
@@ -9,6 +9,7 @@ Test cases for the scheme schemes.
 
 #============================================================================
 
+from collections import namedtuple, OrderedDict
 from unittest import main, TestCase
 
 from anntools.cooperation import *
@@ -28,10 +29,10 @@ class CooperationTestCase(TestCase):
         self.assertRaises(NoCooperationError, add)
         self.assertEqual(len(space), 1)
         for ann in scheme:
-            self.assert_(isinstance(ann, T))
+            self.assertTrue(isinstance(ann, T))
             scheme.remove(ann)
             break
-        self.assert_(not space)
+        self.assertFalse(space)
     def testTupleCooperation(self):
         class T(object): pass
         space={}
@@ -40,24 +41,31 @@ class CooperationTestCase(TestCase):
             scheme.add(T())
         add()
         self.assertEqual(len(space), 1)
-        self.assert_(not isinstance(space['name'], tuple))
+        self.assertFalse(isinstance(space['name'], tuple))
         add()
         self.assertEqual(len(space), 1)
-        self.assert_(isinstance(space['name'], tuple))
+        self.assertTrue(isinstance(space['name'], tuple))
         self.assertEqual(len(space['name']), 2)
         for ann in scheme:
-            self.assert_(isinstance(ann, T))
+            self.assertTrue(isinstance(ann, T))
         for ann in scheme:
-            self.assert_(isinstance(ann, T))
+            self.assertTrue(isinstance(ann, T))
             scheme.remove(ann)
             break
         self.assertEqual(len(space), 1)
-        self.assert_(not isinstance(space['name'], tuple))
+        self.assertFalse(isinstance(space['name'], tuple))
         for ann in scheme:
-            self.assert_(isinstance(ann, T))
+            self.assertTrue(isinstance(ann, T))
             scheme.remove(ann)
             break
-        self.assert_(not space)
+        self.assertFalse(space)
+        # Tuple subclasses are added and removed as tuples of objects
+        Pair=namedtuple('Pair', 'first second')
+        pair=Pair(T(), T())
+        scheme.add(pair)
+        self.assertEqual(len(space['name']), 2)
+        scheme.remove(pair)
+        self.assertFalse(space)
     def testListCooperation(self):
         class T(object): pass
         space={}
@@ -66,24 +74,45 @@ class CooperationTestCase(TestCase):
             scheme.add(T())
         add()
         self.assertEqual(len(space), 1)
-        self.assert_(not isinstance(space['name'], list))
+        self.assertFalse(isinstance(space['name'], list))
         add()
         self.assertEqual(len(space), 1)
-        self.assert_(isinstance(space['name'], list))
+        self.assertTrue(isinstance(space['name'], list))
         self.assertEqual(len(space['name']), 2)
         for ann in scheme:
-            self.assert_(isinstance(ann, T))
+            self.assertTrue(isinstance(ann, T))
         for ann in scheme:
-            self.assert_(isinstance(ann, T))
+            self.assertTrue(isinstance(ann, T))
             scheme.remove(ann)
             break
         self.assertEqual(len(space), 1)
-        self.assert_(not isinstance(space['name'], list))
+        self.assertFalse(isinstance(space['name'], list))
         for ann in scheme:
-            self.assert_(isinstance(ann, T))
+            self.assertTrue(isinstance(ann, T))
             scheme.remove(ann)
             break
-        self.assert_(not space)
+        self.assertFalse(space)
+    def testListCooperationRemove(self):
+        class T(object): pass
+        a, b, c=T(), T(), T()
+        space={'name':[a, b, a, c, a]}
+        scheme=ListCooperation(space, 'name')
+        scheme.remove(a)
+        self.assertEqual(len(space['name']), 2)
+        self.assertTrue(space['name'][0] is b)
+        self.assertTrue(space['name'][1] is c)
+        scheme.remove(b)
+        self.assertTrue(space['name'] is c)
+        # Lists of other tools may be list subclasses
+        class L(list): pass
+        space={'name':L([a, b])}
+        scheme=ListCooperation(space, 'name')
+        self.assertEqual(len(scheme), 2)
+        scheme.add(c)
+        self.assertEqual(len(space['name']), 3)
+        scheme.remove(a)
+        scheme.remove(b)
+        self.assertTrue(space['name'] is c)
     def testDictCooperation(self):
         class T(object): pass
         space={}
@@ -96,27 +125,37 @@ class CooperationTestCase(TestCase):
         addA()
         self.assertEqual(len(space), 1)
         self.assertEqual(len(space['name']), 1)
-        self.assert_('A' in space['name'])
+        self.assertTrue('A' in space['name'])
         self.assertRaises(DictCooperationError, addA)
         addB()
         self.assertEqual(len(space), 1)
         self.assertEqual(len(space['name']), 2)
-        self.assert_('A' in space['name'])
-        self.assert_('B' in space['name'])
+        self.assertTrue('A' in space['name'])
+        self.assertTrue('B' in space['name'])
         self.assertRaises(DictCooperationError, addB)
         for ann in cooperationA:
-            self.assert_(isinstance(ann, T))
+            self.assertTrue(isinstance(ann, T))
             cooperationA.remove(ann)
             break
         self.assertEqual(len(space), 1)
         self.assertEqual(len(space['name']), 1)
-        self.assert_('A' not in space['name'])
-        self.assert_('B' in space['name'])
+        self.assertTrue('A' not in space['name'])
+        self.assertTrue('B' in space['name'])
         for ann in cooperationB:
-            self.assert_(isinstance(ann, T))
+            self.assertTrue(isinstance(ann, T))
             cooperationB.remove(ann)
             break
-        self.assert_(not space)
+        self.assertFalse(space)
+        # Dictionaries of other tools may be dict subclasses
+        t=T()
+        space={'name':OrderedDict([('A', t)])}
+        cooperationA.space=space
+        cooperationB.space=space
+        self.assertEqual(list(cooperationA), [t])
+        addB()
+        self.assertEqual(len(space['name']), 2)
+        cooperationA.remove(t)
+        self.assertEqual(list(space['name']), ['B'])
 
 #============================================================================
 
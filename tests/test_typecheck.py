@@ -9,34 +9,29 @@ Test cases for the type checker.
 
 #============================================================================
 
-import sys
 from math import pi
 from unittest import main, TestCase
 
+from anntools.cooperation import *
 from anntools.typecheck import *
 
 #============================================================================
 
 class TypeCheckerTestCase(TestCase):
     '''Test case for all validators with default TupleCooperation.'''
-    if sys.version_info[0]<3:
-        _u_empty=eval("u''")
-        _u_x=eval("u'x'")
-        _u_abc=eval("u'abc'")
-    else:
-        _u_empty=''
-        _u_x='x'
-        _u_abc='abc'
-        _b_empty=eval("b''")
-        _b_x=eval("b'x'")
-        _b_abc=eval("b'abc'")
+    _u_empty=''
+    _u_x='x'
+    _u_abc='abc'
+    _b_empty=b''
+    _b_x=b'x'
+    _b_abc=b'abc'
     def testNone(self):
         NoneType=type(None)
         @typecheck(a=NoneType, b=(int, NoneType), c=int)
         def fn(a, b, c):
             return b
-        self.assert_(fn(None, 1, 3))
-        self.assert_(not fn(None, None, 3))
+        self.assertTrue(fn(None, 1, 3))
+        self.assertFalse(fn(None, None, 3))
         self.assertRaises(TypeError, fn, 1, 2, 3)
         self.assertRaises(TypeError, fn, 'x', 2, 3)
         self.assertRaises(TypeError, fn, None, 1, None)
@@ -44,8 +39,8 @@ class TypeCheckerTestCase(TestCase):
         @typecheck(b=bool)
         def fn(b):
             return b
-        self.assert_(fn(True))
-        self.assert_(not fn(False))
+        self.assertTrue(fn(True))
+        self.assertFalse(fn(False))
         self.assertRaises(TypeError, fn, 1)
         self.assertRaises(TypeError, fn, 'x')
     def testInt(self):
@@ -77,52 +72,28 @@ class TypeCheckerTestCase(TestCase):
         self.assertRaises(TypeError, fn, pi)
         self.assertRaises(TypeError, fn, 'x')
         self.assertRaises(TypeError, fn, self._u_x)
-    if sys.version_info[0]<3:
-        # Python 2.4-2.6
-        def testStr(self):
-            @typecheck(s=str)
-            def fn(s):
-                return s
-            self.assertEqual(fn(''), '')
-            self.assertEqual(fn('abc'), 'abc')
-            self.assertRaises(TypeError, fn, 1)
-            self.assertRaises(TypeError, fn, False)
-            self.assertRaises(TypeError, fn, int)
-            self.assertRaises(TypeError, fn, self._u_x)
-        def testUnicode(self):
-            @typecheck(s=unicode)
-            def fn(s):
-                return s
-            self.assertEqual(fn(self._u_empty), self._u_empty)
-            self.assertEqual(fn(self._u_abc), self._u_abc)
-            self.assertRaises(TypeError, fn, 1)
-            self.assertRaises(TypeError, fn, False)
-            self.assertRaises(TypeError, fn, int)
-            self.assertRaises(TypeError, fn, 'x')
-    else:
-        # Python 3.0
-        def testBytes(self):
-            @typecheck(s=bytes)
-            def fn(s):
-                return s
-            b1=self._b_empty
-            b2=self._b_abc
-            self.assertEqual(fn(b1), b1)
-            self.assertEqual(fn(b2), b2)
-            self.assertRaises(TypeError, fn, 1)
-            self.assertRaises(TypeError, fn, False)
-            self.assertRaises(TypeError, fn, int)
-            self.assertRaises(TypeError, fn, 'x')
-            self.assertRaises(TypeError, fn, self._u_x)
-        def testStr(self):
-            @typecheck(s=str)
-            def fn(s):
-                return s
-            self.assertEqual(fn(''), '')
-            self.assertEqual(fn('abc'), 'abc')
-            self.assertRaises(TypeError, fn, 1)
-            self.assertRaises(TypeError, fn, False)
-            self.assertRaises(TypeError, fn, int)
+    def testBytes(self):
+        @typecheck(s=bytes)
+        def fn(s):
+            return s
+        b1=self._b_empty
+        b2=self._b_abc
+        self.assertEqual(fn(b1), b1)
+        self.assertEqual(fn(b2), b2)
+        self.assertRaises(TypeError, fn, 1)
+        self.assertRaises(TypeError, fn, False)
+        self.assertRaises(TypeError, fn, int)
+        self.assertRaises(TypeError, fn, 'x')
+        self.assertRaises(TypeError, fn, self._u_x)
+    def testStr(self):
+        @typecheck(s=str)
+        def fn(s):
+            return s
+        self.assertEqual(fn(''), '')
+        self.assertEqual(fn('abc'), 'abc')
+        self.assertRaises(TypeError, fn, 1)
+        self.assertRaises(TypeError, fn, False)
+        self.assertRaises(TypeError, fn, int)
     def testTuple(self):
         @typecheck(v=tuple)
         def fn(v):
@@ -159,6 +130,53 @@ class TypeCheckerTestCase(TestCase):
         self.assertRaises(TypeError, fn, 1.0)
         self.assertRaises(TypeError, fn, 'x')
         self.assertRaises(TypeError, fn, self._u_x)
+    def testCooperation(self):
+        typecheck=TypeCheckDecorator(TupleCooperation)
+        # Any of the types of all annotations is accepted,
+        # objects which are not types are skipped
+        @typecheck(a=int)
+        @typecheck(a=(str, 'description'))
+        def fn(a):
+            return a
+        self.assertEqual(fn(1), 1)
+        self.assertEqual(fn('x'), 'x')
+        self.assertRaises(TypeError, fn, 1.0)
+    def testSignatures(self):
+        @typecheck(int, a=int, b=str)
+        def fn1(a, b):
+            return a
+        self.assertEqual(fn1(1, 'x'), 1)
+        self.assertEqual(fn1(b='x', a=1), 1)
+        self.assertRaises(TypeError, fn1, 'x', 'x')
+        @typecheck(int, a=int, b=str)
+        def fn2(a, b='x', *args, **kw):
+            return a
+        self.assertEqual(fn2(1), 1)
+        self.assertEqual(fn2(1, 'y', 2, c=1.5), 1)
+        self.assertRaises(TypeError, fn2, 1, 2)
+        self.assertRaises(TypeError, fn2, 1, b=2)
+        # Arguments may shadow the builtins used by the generated code
+        @typecheck(isinstance=int)
+        def fn3(isinstance):
+            return isinstance
+        self.assertEqual(fn3(1), 1)
+        self.assertRaises(TypeError, fn3, 'x')
+        # Calls running while the wrapper is updated finish with their plan
+        @typecheck(int, b=str)
+        def fn4(a, b):
+            if b=='x':
+                typecheck(a=int)(fn4)
+            return 1
+        self.assertEqual(fn4('y', 'x'), 1)
+        self.assertRaises(TypeError, fn4, 'y', 'y')
+    def testDisabled(self):
+        typecheck=TypeCheckDecorator(NoCooperation)
+        typecheck._enabled=False
+        def fn(a):
+            return a
+        self.assertTrue(typecheck(a=int)(fn) is fn)
+        self.assertEqual(fn.__annotations__, {'a':int})
+        self.assertEqual(fn('x'), 'x')
 
 #============================================================================
 
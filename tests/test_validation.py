@@ -9,10 +9,14 @@ Test cases for the validators and validator cooperation.
 
 #============================================================================
 
+import functools
+import gc
 import sys
 from math import pi
 from unittest import main, TestCase
 
+from anntools.annotation import _watched
+from anntools.common import validation_enabled, get_function_argument_names, get_plain_argument_names
 from anntools.cooperation import *
 from anntools.validation import *
 
@@ -20,32 +24,43 @@ from anntools.validation import *
 
 class ValidatorTestCase(TestCase):
     '''Test case for all validators with default TupleCooperation.'''
-    if sys.version_info[0]<3:
-        _u_empty=eval("u''")
-        _u_x=eval("u'x'")
-        _u_abc=eval("u'abc'")
-    else:
-        _u_empty=''
-        _u_x='x'
-        _u_abc='abc'
-        _b_empty=eval("b''")
-        _b_x=eval("b'x'")
-        _b_abc=eval("b'abc'")
+    _u_empty=''
+    _u_x='x'
+    _u_abc='abc'
+    _b_empty=b''
+    _b_x=b'x'
+    _b_abc=b'abc'
     def testAllowNone(self):
         @validate(a=AllowNone, b=(Int, AllowNone), c=Int)
         def fn(a, b, c):
             return b
-        self.assert_(fn(None, 1, 3))
-        self.assert_(not fn(None, None, 3))
+        self.assertTrue(fn(None, 1, 3))
+        self.assertFalse(fn(None, None, 3))
         self.assertRaises(ValidationError, fn, 1, 2, 3)
         self.assertRaises(ValidationError, fn, 'x', 2, 3)
         self.assertRaises(ValidationError, fn, None, 1, None)
+        # Other validators are not run for None
+        class NotNone(Validator):
+            @classmethod
+            def _check(cls, value):
+                if value is None:
+                    raise TypeError()
+                return True
+        @validate(a=(NotNone, AllowNone))
+        def fn1(a):
+            return a
+        @validate(a=(NotNone, AllowNone))
+        def fn2(a, b=None):
+            return a
+        for fn in (fn1, fn2):
+            self.assertTrue(fn(None) is None)
+            self.assertEqual(fn(1), 1)
     def testBool(self):
         @validate(b=Bool)
         def fn(b):
             return b
-        self.assert_(fn(True))
-        self.assert_(not fn(False))
+        self.assertTrue(fn(True))
+        self.assertFalse(fn(False))
         self.assertRaises(ValidationError, fn, 1)
         self.assertRaises(ValidationError, fn, 'x')
     def testInt(self):
@@ -104,142 +119,88 @@ class ValidatorTestCase(TestCase):
         self.assertRaises(ValidationError, fn, pi)
         self.assertRaises(ValidationError, fn, 'x')
         self.assertRaises(ValidationError, fn, self._u_x)
-    if sys.version_info[0]<3:
-        # Python 2.4-2.6
-        def testStr(self):
-            @validate(s=Str)
-            def fn(s):
-                return s
-            self.assertEqual(fn(''), '')
-            self.assertEqual(fn('abc'), 'abc')
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-            self.assertRaises(ValidationError, fn, self._u_x)
-        def testStrMaxLength(self):
-            @validate(
-                Str(maxlen=6),
-                s=Str(maxlen=4)
-            )
-            def fn(s):
-                return s+s
-            self.assertEqual(fn(''), '')
-            self.assertEqual(fn('abc'), 'abcabc')
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-            self.assertRaises(ValidationError, fn, self._u_x)
-            self.assertRaises(ValidationError, fn, 'abcd')
-            self.assertRaises(ValidationError, fn, 'abcde')
-        def testUnicode(self):
-            @validate(s=Unicode)
-            def fn(s):
-                return s
-            self.assertEqual(fn(self._u_empty), self._u_empty)
-            self.assertEqual(fn(self._u_abc), self._u_abc)
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-            self.assertRaises(ValidationError, fn, 'x')
-        def testUnicodeMaxLength(self):
-            @validate(
-                Unicode(maxlen=6),
-                s=Unicode(maxlen=4)
-            )
-            def fn(s):
-                return s+s
-            self.assertEqual(fn(self._u_empty), self._u_empty)
-            self.assertEqual(fn(eval(r"u'\u00e1bc'")), eval(r"u'\u00e1bc\u00e1bc'"))
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-            self.assertRaises(ValidationError, fn, 'x')
-            self.assertRaises(ValidationError, fn, eval(r"u'\u00e1bcd'"))
-            self.assertRaises(ValidationError, fn, eval(r"u'\u00e1bcde'"))
-    else:
-        # Python 3.0
-        def testBytes(self):
-            @validate(s=Bytes)
-            def fn(s):
-                return s
-            b1=self._b_empty
-            b2=self._b_abc
-            self.assertEqual(fn(b1), b1)
-            self.assertEqual(fn(b2), b2)
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-            self.assertRaises(ValidationError, fn, 'x')
-            self.assertRaises(ValidationError, fn, self._u_x)
-        def testBytesMaxLength(self):
-            @validate(
-                Bytes(maxlen=6),
-                s=Bytes(maxlen=4)
-            )
-            def fn(s):
-                return s+s
-            b1=self._b_empty
-            b2=self._b_abc
-            b2d=self._b_abc+self._b_abc
-            b3=self._b_abc+self._b_abc[:1]
-            b4=self._b_abc+self._b_abc[:2]
-            self.assertEqual(fn(b1), b1)
-            self.assertEqual(fn(b2), b2d)
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-            self.assertRaises(ValidationError, fn, 'x')
-            self.assertRaises(ValidationError, fn, self._u_x)
-            self.assertRaises(ValidationError, fn, b3)
-            self.assertRaises(ValidationError, fn, b4)
-        def testStr(self):
-            @validate(s=Str)
-            def fn(s):
-                return s
-            self.assertEqual(fn(''), '')
-            self.assertEqual(fn('abc'), 'abc')
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-        def testStrMaxLength(self):
-            @validate(
-                Str(maxlen=6),
-                s=Str(maxlen=4)
-            )
-            def fn(s):
-                return s+s
-            self.assertEqual(fn(''), '')
-            self.assertEqual(fn('abc'), 'abcabc')
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-            self.assertRaises(ValidationError, fn, 'abcd')
-            self.assertRaises(ValidationError, fn, 'abcde')
-        def testUnicode(self):
-            @validate(s=Unicode)
-            def fn(s):
-                return s
-            self.assertEqual(fn(self._u_empty), self._u_empty)
-            self.assertEqual(fn(self._u_abc), self._u_abc)
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-            self.assertRaises(ValidationError, fn, self._b_x)
-        def testUnicodeMaxLength(self):
-            @validate(
-                Unicode(maxlen=6),
-                s=Unicode(maxlen=4)
-            )
-            def fn(s):
-                return s+s
-            self.assertEqual(fn(self._u_empty), self._u_empty)
-            self.assertEqual(fn('\u00e1bc'), '\u00e1bc\u00e1bc')
-            self.assertRaises(ValidationError, fn, 1)
-            self.assertRaises(ValidationError, fn, False)
-            self.assertRaises(ValidationError, fn, int)
-            self.assertRaises(ValidationError, fn, self._b_x)
-            self.assertRaises(ValidationError, fn, '\u00e1bcd')
-            self.assertRaises(ValidationError, fn, '\u00e1bcde')
+    def testBytes(self):
+        @validate(s=Bytes)
+        def fn(s):
+            return s
+        b1=self._b_empty
+        b2=self._b_abc
+        self.assertEqual(fn(b1), b1)
+        self.assertEqual(fn(b2), b2)
+        self.assertRaises(ValidationError, fn, 1)
+        self.assertRaises(ValidationError, fn, False)
+        self.assertRaises(ValidationError, fn, int)
+        self.assertRaises(ValidationError, fn, 'x')
+        self.assertRaises(ValidationError, fn, self._u_x)
+    def testBytesMaxLength(self):
+        @validate(
+            Bytes(maxlen=6),
+            s=Bytes(maxlen=4)
+        )
+        def fn(s):
+            return s+s
+        b1=self._b_empty
+        b2=self._b_abc
+        b2d=self._b_abc+self._b_abc
+        b3=self._b_abc+self._b_abc[:1]
+        b4=self._b_abc+self._b_abc[:2]
+        self.assertEqual(fn(b1), b1)
+        self.assertEqual(fn(b2), b2d)
+        self.assertRaises(ValidationError, fn, 1)
+        self.assertRaises(ValidationError, fn, False)
+        self.assertRaises(ValidationError, fn, int)
+        self.assertRaises(ValidationError, fn, 'x')
+        self.assertRaises(ValidationError, fn, self._u_x)
+        self.assertRaises(ValidationError, fn, b3)
+        self.assertRaises(ValidationError, fn, b4)
+    def testStr(self):
+        @validate(s=Str)
+        def fn(s):
+            return s
+        self.assertEqual(fn(''), '')
+        self.assertEqual(fn('abc'), 'abc')
+        self.assertRaises(ValidationError, fn, 1)
+        self.assertRaises(ValidationError, fn, False)
+        self.assertRaises(ValidationError, fn, int)
+    def testStrMaxLength(self):
+        @validate(
+            Str(maxlen=6),
+            s=Str(maxlen=4)
+        )
+        def fn(s):
+            return s+s
+        self.assertEqual(fn(''), '')
+        self.assertEqual(fn('abc'), 'abcabc')
+        self.assertRaises(ValidationError, fn, 1)
+        self.assertRaises(ValidationError, fn, False)
+        self.assertRaises(ValidationError, fn, int)
+        self.assertRaises(ValidationError, fn, 'abcd')
+        self.assertRaises(ValidationError, fn, 'abcde')
+    def testUnicode(self):
+        @validate(s=Unicode)
+        def fn(s):
+            return s
+        self.assertEqual(fn(self._u_empty), self._u_empty)
+        self.assertEqual(fn(self._u_abc), self._u_abc)
+        self.assertRaises(ValidationError, fn, 1)
+        self.assertRaises(ValidationError, fn, False)
+        self.assertRaises(ValidationError, fn, int)
+        self.assertRaises(ValidationError, fn, self._b_x)
+    def testUnicodeMaxLength(self):
+        @validate(
+            Unicode(maxlen=6),
+            s=Unicode(maxlen=4)
+        )
+        def fn(s):
+            return s+s
+        self.assertEqual(fn(self._u_empty), self._u_empty)
+        self.assertEqual(fn('\u00e1bc'), '\u00e1bc\u00e1bc')
+        self.assertRaises(ValidationError, fn, 1)
+        self.assertRaises(ValidationError, fn, False)
+        self.assertRaises(ValidationError, fn, int)
+        self.assertRaises(ValidationError, fn, self._b_x)
+        self.assertRaises(ValidationError, fn, '\u00e1bcd')
+        self.assertRaises(ValidationError, fn, '\u00e1bcde')
     def testTuple(self):
         @validate(v=Tuple)
         def fn(v):
@@ -281,7 +242,14 @@ class ValidatorTestCase(TestCase):
         def fn(v):
             return True
         self.assertEqual(fn(TypeError()), True)
+        self.assertEqual(fn(Exception()), True)
         self.assertRaises(ValidationError, fn, 1)
+        @validate(v=InstanceOf(int, str))
+        def fn(v):
+            return True
+        self.assertEqual(fn(1), True)
+        self.assertEqual(fn('x'), True)
+        self.assertRaises(ValidationError, fn, 1.0)
     def testSubclassOf(self):
         @validate(v=SubclassOf(int))
         def fn(v):
@@ -293,8 +261,8 @@ class ValidatorTestCase(TestCase):
         @validate(x=Not(Int))
         def fn(x):
             return True
-        self.assert_(fn('x'))
-        self.assert_(fn(pi))
+        self.assertTrue(fn('x'))
+        self.assertTrue(fn(pi))
         self.assertRaises(ValidationError, fn, 3)
     def testAnd(self):
         @validate(x=And(Int(min=0), Int(max=9)))
@@ -304,6 +272,12 @@ class ValidatorTestCase(TestCase):
         self.assertRaises(ValidationError, fn, -1)
         self.assertRaises(ValidationError, fn, 10)
         self.assertRaises(ValidationError, fn, 'x')
+        # Foreign annotation objects are skipped
+        @validate(x=And('foreign', Int))
+        def fn(x):
+            return x
+        self.assertEqual(fn(3), 3)
+        self.assertRaises(ValidationError, fn, 'x')
     def testOr(self):
         @validate(x=Or(Int(min=0), Float(max=9)))
         def fn(x):
@@ -313,6 +287,194 @@ class ValidatorTestCase(TestCase):
         self.assertEqual(int(fn(pi)), 3)
         self.assertRaises(ValidationError, fn, 10.5)
         self.assertRaises(ValidationError, fn, 'x')
+        # Verdicts remembered by type
+        v=Or(Int, Str, AllowNone)
+        for i in range(2):
+            self.assertTrue(v.check(1))
+            self.assertTrue(v.check('x'))
+            self.assertTrue(v.check(None))
+            self.assertFalse(v.check(True))
+            self.assertFalse(v.check(1.5))
+        v=Or(Int(min=0), Str)
+        self.assertTrue(v.check(1))
+        self.assertFalse(v.check(-1))
+        # Proxies of the same type reporting different classes
+        class Proxy(object):
+            def __init__(self, target):
+                self.target=target
+            @property
+            def __class__(self):
+                return self.target.__class__
+        v=Or(Str, Bytes)
+        self.assertTrue(v.check(Proxy('x')))
+        self.assertFalse(v.check(Proxy({})))
+        v=And(Not(Str), Not(Bytes))
+        self.assertFalse(v.check(Proxy('x')))
+        self.assertTrue(v.check(Proxy({})))
+        # Foreign annotation objects are skipped
+        @validate(x=Or('foreign', Int))
+        def fn(x):
+            return x
+        self.assertEqual(fn(3), 3)
+        self.assertRaises(ValidationError, fn, 'x')
+        # Instances without restrictions are checked as the class form
+        v=Or(Int(), Str())
+        self.assertTrue(v.check(1))
+        self.assertFalse(v.check(True))
+    def testError(self):
+        @validate(Int, a=(Int, Str(maxlen=2)))
+        def fn(a):
+            return 'x'
+        try:
+            fn(pi)
+        except ValidationError:
+            e=sys.exc_info()[1]
+            self.assertEqual(e.name, 'a')
+            self.assertEqual(e.value, pi)
+            self.assertEqual(len(e.validators), 2)
+            self.assertTrue("argument 'a' of function 'fn'" in str(e))
+            self.assertTrue('Int, Str validators' in str(e))
+        else:
+            self.fail('ValidationError not raised')
+        try:
+            fn(1)
+        except ValidationError:
+            e=sys.exc_info()[1]
+            self.assertEqual(e.name, 'return')
+            self.assertTrue('return value of function' in str(e))
+            # The message is also the only argument
+            self.assertEqual(e.args, (str(e),))
+            self.assertEqual(repr(e), 'ValidationError(%r)'%str(e))
+        else:
+            self.fail('ValidationError not raised')
+        self.assertEqual(str(ValidationError('message')), 'message')
+        self.assertEqual(ValidationError('message').args, ('message',))
+        self.assertEqual(repr(ValidationError('message')), "ValidationError('message')")
+    def testSignatures(self):
+        # Plain argument list, the wrapper is generated
+        @validate(Int, a=Int, b=Str)
+        def fn1(a, b):
+            return a
+        self.assertEqual(fn1(1, 'x'), 1)
+        self.assertEqual(fn1(b='x', a=1), 1)
+        self.assertRaises(ValidationError, fn1, 'x', 'x')
+        self.assertRaises(ValidationError, fn1, a=1, b=1)
+        self.assertRaises(TypeError, fn1, 1)
+        # Default values, variable and keyword only arguments
+        @validate(Int, a=Int, b=Str, c=Float)
+        def fn2(a, b='x', *args, **kw):
+            return a
+        self.assertEqual(fn2(1), 1)
+        self.assertEqual(fn2(1, 'y', 2, c=1.5), 1)
+        self.assertRaises(ValidationError, fn2, 1, 2)
+        self.assertRaises(ValidationError, fn2, 1, c='x')
+        @validate(a=Int, b=Str)
+        def fn3(a, *, b):
+            return a
+        self.assertEqual(fn3(1, b='x'), 1)
+        self.assertRaises(ValidationError, fn3, 1, b=1)
+        # The bound argument of methods is not passed by the caller
+        class C(object):
+            def m(self, a):
+                return a
+        self.assertEqual(get_plain_argument_names(C().m), ('a',))
+        self.assertEqual(get_function_argument_names(C().m), ['a'])
+        fn4=validate(a=Int)(C().m)
+        self.assertEqual(fn4(5), 5)
+        self.assertRaises(ValidationError, fn4, 'x')
+        fn5=ValidationDecorator(TupleCooperation)(a=Int)(C().m)
+        self.assertEqual(fn5(a=5), 5)
+        self.assertRaises(ValidationError, fn5, a='x')
+    def testInline(self):
+        # Wrappers generated for plain signatures inline the validators,
+        # they must accept the same values as the generic wrapper
+        class Seven(Validator):
+            @classmethod
+            def _check(cls, value):
+                return value==7
+        validators=[
+            AllowNone, Bool, Int, Float, Complex, Bytes, Str, Unicode,
+            Tuple, List, Dict, Set, AllowNone(), Bool(), Int(), Float(),
+            Complex(), Str(), Int(min=0, max=9), Float(min=0),
+            Float(max=9), Str(maxlen=1), Bytes(maxlen=1), Tuple(),
+            InstanceOf(int), InstanceOf(int, str), SubclassOf(int),
+            Not(Int), Not('foreign'), And(Int, Not(Bool)), And(),
+            Or(Str, Float(min=0)), Or(), Seven, Or(Seven, Int(min=9)),
+        ]
+        values=[
+            None, True, 0, 1, 7, -1, 10, 1.5, -1.5, 1j, '', 'x', 'abc',
+            self._b_empty, self._b_abc, (), (1,), [], {}, set(), int, bool,
+        ]
+        for validator in validators:
+            @validate(a=validator)
+            def plain(a):
+                return True
+            @validate(a=validator)
+            def generic(a, b=None):
+                return True
+            for value in values:
+                try:
+                    expected=generic(value)
+                except ValidationError:
+                    expected=False
+                try:
+                    actual=plain(value)
+                except ValidationError:
+                    actual=False
+                self.assertEqual(actual, expected, (validator, value))
+    def testStacked(self):
+        @validate(a=Int)
+        def fn1(a, b):
+            return a
+        # The wrapper of the same decorator gets the new annotations
+        fn2=validate(b=Str)(fn1)
+        self.assertTrue(fn2 is fn1)
+        self.assertEqual(fn1(1, 'x'), 1)
+        self.assertRaises(ValidationError, fn1, 'x', 'x')
+        self.assertRaises(ValidationError, fn1, 1, 1)
+        # Other decorators wrap it again
+        fn3=ValidationDecorator(TupleCooperation)(Int)(fn1)
+        self.assertTrue(fn3 is not fn1)
+        self.assertEqual(fn3(1, 'x'), 1)
+        self.assertRaises(ValidationError, fn3, 1, 1)
+        # Foreign wrappers copying the attributes are wrapped again
+        def parse_ints(fn):
+            @functools.wraps(fn)
+            def wrapper(a, b):
+                return fn(int(a), b)
+            return wrapper
+        @validate(a=Int)
+        @parse_ints
+        @validate(b=Str)
+        def fn4(a, b):
+            return a
+        self.assertRaises(ValidationError, fn4, '5', 'x')
+        self.assertRaises(ValidationError, fn4, 5, 5)
+        self.assertEqual(fn4(5, 'x'), 5)
+        # Only the live wrappers are kept to follow the annotations
+        def fn5(a):
+            return a
+        for i in range(100):
+            validate(a=Int)(fn5)
+        gc.collect()
+        self.assertTrue(len(_watched[fn5])<=1)
+        fn6=validate(a=Int)(fn5)
+        self.assertTrue(len(_watched[fn5])<=2)
+        self.assertRaises(ValidationError, fn6, 'x')
+    def testDisabled(self):
+        validate=ValidationDecorator(TupleCooperation)
+        validate._enabled=False
+        def fn(a):
+            return a
+        self.assertTrue(validate(a=Int)(fn) is fn)
+        self.assertEqual(fn.__annotations__, {'a':Int})
+        self.assertEqual(fn('x'), 'x')
+    def testEnvironment(self):
+        self.assertTrue(validation_enabled({}))
+        self.assertTrue(validation_enabled({'ANNTOOLS_VALIDATION':'1'}))
+        self.assertFalse(validation_enabled({'ANNTOOLS_VALIDATION':'Off'}))
+        self.assertFalse(validation_enabled({'ANNTOOLS_DISABLE_VALIDATE':'1'}))
+        self.assertTrue(validation_enabled({'ANNTOOLS_DISABLE_VALIDATE':'0'}))
 
 #============================================================================
 
@@ -324,7 +486,7 @@ class ValidatorCooperationTestCase(TestCase):
         @validate
         def fn1(a):
             return True
-        self.assert_(fn1('x'))
+        self.assertTrue(fn1('x'))
         # Non-cooperative simple annotation,
         # validation occours and raises exception normally:
         @validate(Bool, a=Int)
@@ -336,7 +498,7 @@ class ValidatorCooperationTestCase(TestCase):
         @validate(b=Str)
         def fn3(a, b):
             return True
-        self.assert_(fn3(1, 'x'))
+        self.assertTrue(fn3(1, 'x'))
         self.assertRaises(ValidationError, fn3, 'x', 1)
         # Multiple annotations for the same argument won't work:
         def fn4def():
@@ -352,28 +514,30 @@ class ValidatorCooperationTestCase(TestCase):
             def fn5(a):
                 return True
         self.assertRaises(NoCooperationError, fn5def)
+        # The decorator does not hold the annotations of the last function
+        self.assertTrue(validate._cooperation.space is None)
     def testTupleCooperation(self):
         validate=ValidationDecorator(TupleCooperation)
         # Single annotation:
         @validate(Bool, a=Int)
         def fn1(a):
             return True
-        self.assert_(fn1(1))
+        self.assertTrue(fn1(1))
         self.assertRaises(ValidationError, fn1, None)
         # Multiple validators with single annotation:
         @validate(Bool, a=(AllowNone, Int))
         def fn2(a):
             return True
-        self.assert_(fn2(None))
-        self.assert_(fn2(1))
+        self.assertTrue(fn2(None))
+        self.assertTrue(fn2(1))
         self.assertRaises(ValidationError, fn2, 'x')
         # Multiple annotations for a single argument (cooperation) works:
         @validate(a=Bool)
         @validate(a=Str)
         def fn3(a):
             return True
-        self.assert_(fn3(True))
-        self.assert_(fn3('x'))
+        self.assertTrue(fn3(True))
+        self.assertTrue(fn3('x'))
         self.assertRaises(ValidationError, fn3, 1)
     def testListCooperation(self):
         validate=ValidationDecorator(ListCooperation)
@@ -381,22 +545,22 @@ class ValidatorCooperationTestCase(TestCase):
         @validate(Bool, a=Int)
         def fn1(a):
             return True
-        self.assert_(fn1(1))
+        self.assertTrue(fn1(1))
         self.assertRaises(ValidationError, fn1, None)
         # Multiple validators with single annotation:
         @validate(Bool, a=[AllowNone, Int])
         def fn2(a):
             return True
-        self.assert_(fn2(None))
-        self.assert_(fn2(1))
+        self.assertTrue(fn2(None))
+        self.assertTrue(fn2(1))
         self.assertRaises(ValidationError, fn2, 'x')
         # Multiple annotations for a single argument (cooperation) works:
         @validate(a=Bool)
         @validate(a=Str)
         def fn3(a):
             return True
-        self.assert_(fn3(True))
-        self.assert_(fn3('x'))
+        self.assertTrue(fn3(True))
+        self.assertTrue(fn3('x'))
         self.assertRaises(ValidationError, fn3, 1)
     def testDictCooperation(self):
         validateA=ValidationDecorator(DictCooperation, dict(storekey='A'))
@@ -405,14 +569,14 @@ class ValidatorCooperationTestCase(TestCase):
         @validateA(Bool, a=Int)
         def fn1(a):
             return True
-        self.assert_(fn1(1))
+        self.assertTrue(fn1(1))
         self.assertRaises(ValidationError, fn1, None)
         # Multiple validators with single annotation, must use composite:
         @validateA(Bool, a=Or(AllowNone, Int))
         def fn2(a):
             return True
-        self.assert_(fn2(None))
-        self.assert_(fn2(1))
+        self.assertTrue(fn2(None))
+        self.assertTrue(fn2(1))
         self.assertRaises(ValidationError, fn2, 'x')
         # Multiple annotations for a single argument (cooperation) works,
         # but validates independently (no logical or between validators):
@@ -420,7 +584,7 @@ class ValidatorCooperationTestCase(TestCase):
         @validateB(a=Float)
         def fn3(a):
             return True
-        self.assert_(fn3(1))
+        self.assertTrue(fn3(1))
         self.assertRaises(ValidationError, fn3, pi)
         self.assertRaises(ValidationError, fn3, True)
         self.assertRaises(ValidationError, fn3, 'x')